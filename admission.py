@@ -0,0 +1,100 @@
+"""Admission control for inference endpoints.
+
+Tracks how much work is in flight and how long it has been taking, so that when the
+box falls behind, excess background work (CameraModal's polling frames) is shed
+immediately instead of queueing until clients time out. Priority work (sign-in
+conversions) is always admitted and has capacity reserved for it. Bulk work (batch and
+clip scoring) takes background slots too, but waits for one instead of being shed.
+
+The same numbers drive a suggested poll interval that is sent back to clients, so
+they slow down under load and speed back up when it clears.
+"""
+from __future__ import annotations
+
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator
+
+
+class AdmissionController:
+    """Counts in-flight requests and keeps an EWMA of their latency."""
+
+    def __init__(self, max_inflight: int = 2, priority_reserve: int = 1,
+                 min_interval_ms: int = 400, max_interval_ms: int = 5000, alpha: float = 0.2):
+        self.max_inflight = max_inflight
+        self.priority_reserve = priority_reserve
+        self.min_interval_ms = min_interval_ms
+        self.max_interval_ms = max_interval_ms
+        self.alpha = alpha
+        self._inflight = 0
+        self._priority_inflight = 0
+        self._latency_ms = 0.0
+        self._shed = 0
+        self._lock = threading.Lock()
+        self._freed = threading.Condition(self._lock)
+
+    def _background_full(self) -> bool:
+        return self._inflight >= max(1, self.max_inflight - self.priority_reserve)
+
+    def try_admit(self, priority: bool = False) -> bool:
+        """Reserve a slot; background work is refused once only the reserve is left."""
+        with self._lock:
+            if not priority and self._background_full():
+                self._shed += 1
+                return False
+            self._inflight += 1
+            if priority:
+                self._priority_inflight += 1
+            return True
+
+    def wait_admit(self) -> None:
+        """Reserve a background slot, blocking until one is free (bulk work is not shed)."""
+        with self._freed:
+            self._freed.wait_for(lambda: not self._background_full())
+            self._inflight += 1
+
+    def done(self, elapsed_s: float, priority: bool = False) -> None:
+        """Release a slot and fold its latency into the moving average."""
+        with self._lock:
+            self._inflight -= 1
+            if priority:
+                self._priority_inflight -= 1
+            else:
+                ms = elapsed_s * 1000
+                self._latency_ms = ms if self._latency_ms == 0 else (1 - self.alpha) * self._latency_ms + self.alpha * ms
+            self._freed.notify()
+
+    @contextmanager
+    def admit(self, priority: bool = False, wait: bool = False) -> Iterator[bool]:
+        """Context manager form; yields whether the work was admitted.
+
+        With ``wait``, background work blocks until a slot frees up and is always admitted.
+        """
+        if wait and not priority:
+            self.wait_admit()
+            admitted = True
+        else:
+            admitted = self.try_admit(priority)
+        started = time.perf_counter()
+        try:
+            yield admitted
+        finally:
+            if admitted:
+                self.done(time.perf_counter() - started, priority)
+
+    def poll_interval_ms(self) -> int:
+        """How often a background client should poll given current latency and load."""
+        with self._lock:
+            pressure = 1 + self._inflight
+            interval = self._latency_ms * pressure
+        return int(min(self.max_interval_ms, max(self.min_interval_ms, interval)))
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            return {
+                "inflight": self._inflight,
+                "priority_inflight": self._priority_inflight,
+                "latency_ms": round(self._latency_ms, 1),
+                "shed": self._shed,
+            }
@@ -1,39 +1,94 @@
 from __future__ import annotations
 
+import atexit
 import base64
+import functools
+import hashlib
 import io
+import json
+import mimetypes
 import os
-from typing import Dict, List, Set, Tuple
-
-import cv2
-import numpy as np
-from flask import Flask, jsonify, render_template, request, send_from_directory
+import re
+import tempfile
+import threading
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from itertools import islice
+from typing import IO, TYPE_CHECKING, Any, Callable, Dict, Iterable, Iterator, List, Set, Tuple
+
+from flask import Flask, Request, Response, jsonify, render_template, request, send_file, send_from_directory
 import time
 import pathlib
 from flask_cors import CORS
-from PIL import Image, ImageDraw
-import requests
+from werkzeug.exceptions import NotFound, RequestEntityTooLarge
+from werkzeug.security import safe_join
+
+from admission import AdmissionController
+from detectors import DetectorRegistry, ModelUnavailable, SessionStates
+from lazy import LazyModule, module_available
+from store import open_store
 
-try:
+if TYPE_CHECKING:
+    from frame_ring import FrameRing
     from ultralytics import YOLO
-except Exception:  # pragma: no cover
-    YOLO = None  # type: ignore
 
-try:
-    import google.generativeai as genai
-    GEMINI_AVAILABLE = True
-except Exception:  # pragma: no cover
-    GEMINI_AVAILABLE = False  # type: ignore
+# Heavy modules are imported on first use (or by warm_up), so booting a worker and
+# serving the static/React routes never waits on them.
+cv2 = LazyModule("cv2")
+np = LazyModule("numpy")
+Image = LazyModule("PIL.Image")
+ImageDraw = LazyModule("PIL.ImageDraw")
+overlay = LazyModule("overlay")
+tracking = LazyModule("tracking")
+requests = LazyModule("requests")
+genai = LazyModule("google.generativeai")
+
+YOLO_AVAILABLE = module_available("ultralytics")
+GEMINI_AVAILABLE = module_available("google.generativeai")
+
+
+# The React build is served by index/serve_react (see _send_frontend_file), not by
+# Flask's built-in static route, which would shadow the SPA fallback.
+class PerformativeRequest(Request):
+    """Lets /detect_batch and /detect_clip accept uploads larger than the per-image body limit."""
+
+    @property
+    def max_content_length(self) -> int | None:
+        if self.endpoint == "detect_batch":
+            return BATCH_MAX_UPLOAD_BYTES
+        if self.endpoint == "detect_clip":
+            return CLIP_MAX_BYTES + 64 * 1024
+        return super().max_content_length
+
+
+app = Flask(__name__, static_folder=None, template_folder='templates')
+app.request_class = PerformativeRequest
+CORS(app)  # Enable CORS for React frontend
 
+# Upper bound on a single decoded upload (before base64); the request body limit adds
+# headroom for base64's 4/3 inflation plus the JSON envelope.
+MAX_IMAGE_BYTES = 12 * 1024 * 1024
+MAX_IMAGE_PIXELS = 40_000_000
+app.config["MAX_CONTENT_LENGTH"] = MAX_IMAGE_BYTES * 4 // 3 + 64 * 1024
+# Whole-archive limit for /detect_batch (werkzeug spools large uploads to disk)
+BATCH_MAX_UPLOAD_BYTES = 1024 * 1024 * 1024
 
-# Serve static files from both locations
-app = Flask(__name__, static_folder='frontend/dist', static_url_path='', template_folder='templates')
-CORS(app)  # Enable CORS for React frontend
+FRONTEND_DIST = pathlib.Path("frontend/dist")
 
+# Vite emits content-hashed names like assets/index-Dp5qKzyj.js; those never change
+# bytes, everything else (index.html, public/ copies) must be revalidated.
+HASHED_ASSET_RE = re.compile(r"^assets/.+-[A-Za-z0-9_-]{8}\.[A-Za-z0-9]+$")
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
 
-# Load YOLO model once at startup. Falls back gracefully if ultralytics missing.
-MODEL: YOLO | None = None
-DETECTION_READY: bool = False
+# Variants written next to each asset by the precompress plugin in vite.config.ts,
+# in order of preference.
+PRECOMPRESSED_ENCODINGS: Tuple[Tuple[str, str], ...] = (("br", ".br"), ("gzip", ".gz"))
+
+
+# YOLO is loaded lazily by the detector registry on the first frame that needs it.
+# DETECTION_READY turns False if ultralytics is missing or the weights fail to load.
+DETECTION_READY: bool = YOLO_AVAILABLE
 
 # Initialize Gemini API - function to reload config
 # FALLBACK API KEY (hardcoded as backup if env var fails)
@@ -80,30 +135,32 @@ def init_gemini():
         GEMINI_MODEL = None
         GEMINI_READY = False
 
-# Initialize on import
+# Initialized on first use (the endpoints call init_gemini while not ready) or by warm_up
 GEMINI_API_KEY = ""
 GEMINI_MODEL = None
 GEMINI_READY = False
-init_gemini()
 
 
-def load_model() -> None:
-    global MODEL, DETECTION_READY
-    if YOLO is None:
+def load_model() -> YOLO:
+    """Load the YOLO model; called by the detector registry on first use."""
+    global DETECTION_READY
+    if not YOLO_AVAILABLE:
         print("WARNING: YOLO not available - ultralytics not installed")
         DETECTION_READY = False
-        return
+        raise RuntimeError("ultralytics not installed")
     try:
         print("Loading YOLO model...")
-        MODEL = YOLO("yolov8n.pt")  # small, fast model (auto-downloads if missing)
+        from ultralytics import YOLO
+        model = YOLO("yolov8n.pt")  # small, fast model (auto-downloads if missing)
         DETECTION_READY = True
         print(f"✓ YOLO model loaded successfully (DETECTION_READY={DETECTION_READY})")
+        return model
     except Exception as e:
         print(f"ERROR: Failed to load YOLO model: {e}")
         import traceback
         traceback.print_exc()
-        MODEL = None
         DETECTION_READY = False
+        raise
 
 
 # Map COCO class names to our "performative" items
@@ -293,112 +350,414 @@ def detect_wired_earphones(bgr: np.ndarray) -> Tuple[bool, float]:
         return False, 0.0
 
 
-def parse_data_url_to_bgr(data_url: str) -> np.ndarray:
-    """Convert a data URL (data:image/jpeg;base64,...) to an OpenCV BGR image."""
+# Long-side resolution each endpoint actually works at. Uploads are decoded straight
+# to (roughly) this size instead of at native resolution.
+# /detect keeps the CameraModal's 1280px frames intact because detect_wired_earphones
+# uses absolute pixel sizes; YOLO resizes to 640 internally either way.
+DETECT_MAX_SIDE = 1280
+GEMINI_MAX_SIDE = 1024
+CONVERT_MAX_SIDE = 1280
+GIF_MAX_SIDE = 320
+
+_CV2_REDUCED_FLAGS: Dict[int, str] = {
+    1: "IMREAD_COLOR",
+    2: "IMREAD_REDUCED_COLOR_2",
+    4: "IMREAD_REDUCED_COLOR_4",
+    8: "IMREAD_REDUCED_COLOR_8",
+}
+
+
+class ImageTooLarge(RequestEntityTooLarge):
+    """Upload exceeds MAX_IMAGE_BYTES or MAX_IMAGE_PIXELS (HTTP 413)."""
+
+
+def decode_data_url(data_url: str) -> bytes:
+    """Strip the data URL prefix and base64-decode, enforcing MAX_IMAGE_BYTES."""
     if "," in data_url:
         base64_part = data_url.split(",", 1)[1]
     else:
         base64_part = data_url
-    binary = base64.b64decode(base64_part)
-    image = np.frombuffer(binary, dtype=np.uint8)
-    bgr = cv2.imdecode(image, cv2.IMREAD_COLOR)
+    if len(base64_part) * 3 // 4 > MAX_IMAGE_BYTES:
+        raise ImageTooLarge(f"Image exceeds {MAX_IMAGE_BYTES // (1024 * 1024)} MB")
+    return base64.b64decode(base64_part)
+
+
+def _image_header(binary: bytes) -> Image.Image:
+    """Open an image lazily (header only) and enforce MAX_IMAGE_PIXELS."""
+    try:
+        img = Image.open(io.BytesIO(binary))
+    except Image.DecompressionBombError as e:
+        # Pillow's own limit (far above ours) trips inside open() for huge images
+        raise ImageTooLarge(f"Image exceeds {MAX_IMAGE_PIXELS // 1_000_000} megapixels") from e
+    except Exception as e:
+        raise ValueError("Failed to decode image") from e
+    w, h = img.size
+    if w * h > MAX_IMAGE_PIXELS:
+        raise ImageTooLarge(f"Image is {w}x{h}; limit is {MAX_IMAGE_PIXELS // 1_000_000} megapixels")
+    return img
+
+
+def _reduction_factor(size: Tuple[int, int], max_side: int) -> int:
+    """Largest JPEG DCT scale (1, 2, 4 or 8) that keeps the long side >= max_side."""
+    long_side = max(size)
+    factor = 1
+    while factor < 8 and long_side // (factor * 2) >= max_side:
+        factor *= 2
+    return factor
+
+
+def decode_bgr(binary: bytes, max_side: int) -> np.ndarray:
+    """Decode to an OpenCV BGR image whose long side is at most max_side.
+
+    JPEGs are decoded at a reduced scale (IMREAD_REDUCED_*) so the full-resolution
+    bitmap is never materialized; the remainder is closed with an INTER_AREA resize.
+    """
+    header = _image_header(binary)
+    factor = _reduction_factor(header.size, max_side) if header.format == "JPEG" else 1
+    bgr = cv2.imdecode(np.frombuffer(binary, dtype=np.uint8), getattr(cv2, _CV2_REDUCED_FLAGS[factor]))
     if bgr is None:
         raise ValueError("Failed to decode image")
+    h, w = bgr.shape[:2]
+    if max(h, w) > max_side:
+        scale = max_side / max(h, w)
+        bgr = cv2.resize(bgr, (max(1, round(w * scale)), max(1, round(h * scale))), interpolation=cv2.INTER_AREA)
     return bgr
 
 
-def performative_detect(bgr: np.ndarray) -> Tuple[List[Dict], Set[str]]:
-    """Run YOLO on the frame and extract performative detections.
-    Also runs custom earphone detection.
+def decode_pil(binary: bytes, max_side: int, mode: str = "RGB") -> Image.Image:
+    """Decode to a PIL image whose long side is at most max_side (JPEG via draft())."""
+    img = _image_header(binary)
+    w, h = img.size
+    if max(w, h) > max_side:
+        scale = max_side / max(w, h)
+        # draft() only ever picks a scale that is still >= the requested size
+        img.draft("RGB", (max(1, int(w * scale)), max(1, int(h * scale))))
+        img.thumbnail((max_side, max_side), Image.LANCZOS)
+    return img.convert(mode)
 
-    Returns a tuple of:
-      - list of dicts {label, name, confidence}
-      - set of canonical labels detected (e.g., {"Matcha", "Books", "Wired Earphones"})
+
+def parse_data_url_to_bgr(data_url: str, max_side: int = DETECT_MAX_SIDE) -> np.ndarray:
+    """Convert a data URL (data:image/jpeg;base64,...) to a bounded OpenCV BGR image."""
+    return decode_bgr(decode_data_url(data_url), max_side)
+
+
+def parse_data_url_to_pil(data_url: str, max_side: int, mode: str = "RGB") -> Image.Image:
+    """Convert a data URL to a bounded PIL image in the given mode."""
+    return decode_pil(decode_data_url(data_url), max_side, mode)
+
+
+def _too_large_response(e: RequestEntityTooLarge, **extra):
+    return jsonify({"ok": False, "error": e.description, **extra}), 413
+
+
+# Decoded /detect frames can be published in a shared-memory ring, so an inference
+# process attached via FRAME_RING.handle() reads the same pixels without copies or
+# pickling. Off by default (FRAME_RING_SLOTS=0): detectors in this process already
+# share one decoded array, and publishing costs a copy per frame plus /dev/shm space
+# per worker. Set it to a few slots when such a consumer process runs.
+FRAME_RING_SLOTS = int(os.environ.get("FRAME_RING_SLOTS", "0"))
+FRAME_RING: FrameRing | None = None
+_FRAME_RING_LOCK = threading.Lock()
+
+
+def get_frame_ring() -> FrameRing | None:
+    """Create the frame ring on first use (per worker process)."""
+    global FRAME_RING, FRAME_RING_SLOTS
+    if FRAME_RING is None and FRAME_RING_SLOTS > 0:
+        with _FRAME_RING_LOCK:
+            if FRAME_RING is None and FRAME_RING_SLOTS > 0:
+                from frame_ring import FrameRing  # pulls in numpy
+
+                try:
+                    FRAME_RING = FrameRing(FRAME_RING_SLOTS, (DETECT_MAX_SIDE, DETECT_MAX_SIDE, 3))
+                    atexit.register(FRAME_RING.close)
+                except OSError as e:
+                    app.logger.warning(f"Shared frame ring unavailable, using private frames: {e}")
+                    FRAME_RING_SLOTS = 0
+    return FRAME_RING
+
+
+@contextmanager
+def shared_frame(bgr: np.ndarray) -> Iterator[np.ndarray]:
+    """Publish a frame in FRAME_RING for the duration of the block.
+
+    Yields the read-only shared view, or ``bgr`` itself when the ring is disabled or full.
     """
-    detections: List[Dict] = []
-    labels_found: Set[str] = set()
-    
-    # Run YOLO detection if available
-    if DETECTION_READY and MODEL is not None:
+    ring = get_frame_ring()
+    ref = None
+    if ring is not None:
+        from frame_ring import RingFull
+
         try:
-            # Run inference
-            results = MODEL.predict(bgr, imgsz=640, verbose=False)
-            if results:
-                r = results[0]
-                names = r.names  # id -> class name
-
-                if r.boxes is not None and len(r.boxes) > 0:
-                    for box in r.boxes:
-                        cls_id = int(box.cls.item()) if hasattr(box.cls, "item") else int(box.cls)
-                        conf = float(box.conf.item()) if hasattr(box.conf, "item") else float(box.conf)
-                        class_name = names.get(cls_id, str(cls_id))
-                        
-                        if class_name in TARGET_CLASS_TO_LABEL:
-                            friendly = TARGET_CLASS_TO_LABEL[class_name]
-                            min_conf = MIN_CONFIDENCE.get(friendly, 0.5)
-                            
-                            # STRICT: Only accept if confidence exceeds threshold
-                            if conf >= min_conf:
-                                # Additional validation for Matcha (cup) - check color/brightness
-                                if friendly == "Matcha" and conf >= min_conf:
-                                    # Extract ROI and check if it looks greenish (matcha color)
-                                    x1, y1, x2, y2 = box.xyxy[0].tolist()
-                                    x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
-                                    roi = bgr[max(0, y1):min(bgr.shape[0], y2), max(0, x1):min(bgr.shape[1], x2)]
-                                    if roi.size > 0:
-                                        # Convert to HSV and check green channel
-                                        hsv_roi = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
-                                        # Matcha is typically green (H: 60-120 in HSV)
-                                        green_pixels = np.sum((hsv_roi[:, :, 0] >= 40) & (hsv_roi[:, :, 0] <= 80))
-                                        green_ratio = green_pixels / (roi.shape[0] * roi.shape[1]) if roi.size > 0 else 0
-                                        # Require at least 15% green pixels to be matcha
-                                        if green_ratio < 0.15:
-                                            app.logger.debug(f"Rejected cup as matcha (green ratio: {green_ratio:.2f})")
-                                            continue
-                                
-                                # Additional validation for Books - check aspect ratio
-                                if friendly == "Books" and conf >= min_conf:
-                                    x1, y1, x2, y2 = box.xyxy[0].tolist()
-                                    width = abs(x2 - x1)
-                                    height = abs(y2 - y1)
-                                    aspect_ratio = width / height if height > 0 else 0
-                                    # Books should be rectangular, not too square (avoid false positives)
-                                    if aspect_ratio < 0.3 or aspect_ratio > 3.0:
-                                        app.logger.debug(f"Rejected book (aspect ratio: {aspect_ratio:.2f})")
-                                        continue
-                                
-                                detections.append({
-                                    "name": class_name,
-                                    "label": friendly,
-                                    "confidence": round(conf, 3),
-                                })
-                                labels_found.add(friendly)
-        except Exception as e:
-            app.logger.warning(f"YOLO detection failed: {e}", exc_info=True)
-            # Continue with earphone detection even if YOLO fails
-    
-    # Run custom wired earphone detection (STRICT - only if confidence is high enough)
+            ref = ring.put(bgr)
+        except RingFull:
+            app.logger.debug("Frame ring full, using private frame")
+    if ref is None:
+        yield bgr
+        return
+    try:
+        yield ring.view(ref)
+    finally:
+        ring.release(ref)
+
+
+def _yolo_classes(model: YOLO, wanted: Set[str]) -> List[int]:
+    """Class ids behind the labels still wanted, so YOLO skips everything else."""
+    return [cls_id for cls_id, name in model.names.items() if TARGET_CLASS_TO_LABEL.get(name) in wanted]
+
+
+def yolo_detect(bgr: np.ndarray, model: YOLO, wanted: Set[str]) -> List[Dict]:
+    """COCO YOLO detector for Books/Matcha/Camera/Plushie, with the strict validations."""
+    classes = _yolo_classes(model, wanted)
+    if not classes:
+        return []
+    # Run inference
+    results = model.predict(bgr, imgsz=640, classes=classes, verbose=False)
+    return _yolo_detections(bgr, results[0]) if results else []
+
+
+def yolo_detect_batch(frames: List[np.ndarray], model: YOLO, wanted: Set[str]) -> List[List[Dict]]:
+    """Batched yolo_detect: one predict() call for a list of frames."""
+    classes = _yolo_classes(model, wanted)
+    if not classes or not frames:
+        return [[] for _ in frames]
+    results = model.predict(frames, imgsz=640, classes=classes, verbose=False)
+    return [_yolo_detections(bgr, r) for bgr, r in zip(frames, results)]
+
+
+# Tracked re-detection: YOLO on crops around the objects seen in this session, with a
+# smaller input size since the crops are small (see tracking.py)
+ROI_IMGSZ = 320
+
+
+def _yolo_wanted_names(wanted: Set[str]) -> Set[str]:
+    """COCO class names behind the labels still wanted."""
+    return {name for name, label in TARGET_CLASS_TO_LABEL.items() if label in wanted}
+
+
+def yolo_detect_tracked(bgr: np.ndarray, model: YOLO, wanted: Set[str], state: Dict[str, Any]) -> List[Dict]:
+    """yolo_detect that follows this session's candidate boxes and re-checks only crops.
+
+    Boxes of still-wanted classes that are below the confidence threshold are tracked;
+    while every wanted class has a track, enlarged crops around them go through YOLO
+    (a closer look that may push them over it) and the same validations. Boxes that
+    fail a validation (a cup that is not green, a book of the wrong shape) are dropped
+    rather than re-checked, and any wanted class without a track gets a full-frame pass.
+    """
+    classes = _yolo_classes(model, wanted)
+    if not classes:
+        return []
+    names = _yolo_wanted_names(wanted)
+    tracker = state.get("tracker")
+    if tracker is None:
+        tracker = state["tracker"] = tracking.ROITracker()
+
+    if not tracker.needs_refresh(bgr, names):
+        tracker.follow(bgr, names)
+    if tracker.needs_refresh(bgr, names):
+        state["mode"] = "full"
+        r = model.predict(bgr, imgsz=640, classes=classes, verbose=False)[0]
+        rejected: Set[int] = set()
+        detections = _yolo_detections(bgr, r, rejected)
+        tracker.reset(bgr, _yolo_boxes(r, names, skip=rejected))
+        return detections
+
+    state["mode"] = "tracked"
+    rois = tracker.rois()
+    crops = [bgr[y1:y2, x1:x2] for x1, y1, x2, y2 in rois]
+    results = model.predict(crops, imgsz=ROI_IMGSZ, classes=classes, verbose=False)
+    detections = []
+    found, dropped = [], []
+    for (x1, y1, _, _), crop, r in zip(rois, crops, results):
+        rejected = set()
+        detections.extend(_yolo_detections(crop, r, rejected))
+        found.extend(_yolo_boxes(r, names, offset=(x1, y1), skip=rejected))
+        dropped.extend(_yolo_boxes(r, names, offset=(x1, y1), only=rejected))
+    tracker.confirm(bgr, found, rejected=dropped)
+    return detections
+
+
+def yolo_tracked_mode(bgr: np.ndarray, wanted: Set[str], state: Dict[str, Any]) -> str:
+    """Whether yolo_detect_tracked will do a full-frame pass or crop passes on ``bgr``."""
+    tracker = state.get("tracker")
+    return "full" if tracker is None or tracker.needs_refresh(bgr, _yolo_wanted_names(wanted)) else "tracked"
+
+
+def _yolo_boxes(r, names: Set[str], offset: Tuple[int, int] = (0, 0), skip: Set[int] = frozenset(),
+                only: Set[int] | None = None) -> List[Tuple[str, Tuple[float, float, float, float]]]:
+    """(class name, full-frame xyxy) for boxes of the given classes, by index in ``r.boxes``.
+
+    ``skip`` leaves out, and ``only`` keeps just, the boxes with those indices.
+    """
+    ox, oy = offset
+    boxes = []
+    if r.boxes is not None:
+        for i, box in enumerate(r.boxes):
+            if i in skip or (only is not None and i not in only):
+                continue
+            cls_id = int(box.cls.item()) if hasattr(box.cls, "item") else int(box.cls)
+            name = r.names.get(cls_id)
+            if name in names:
+                x1, y1, x2, y2 = box.xyxy[0].tolist()
+                boxes.append((name, (x1 + ox, y1 + oy, x2 + ox, y2 + oy)))
+    return boxes
+
+
+def _yolo_detections(bgr: np.ndarray, r, rejected: Set[int] | None = None) -> List[Dict]:
+    """Turn one YOLO result into performative detections (Matcha/Books validations).
+
+    Indices (in ``r.boxes``) of boxes that were confident enough but failed a
+    validation are added to ``rejected`` when given.
+    """
+    detections: List[Dict] = []
+    names = r.names  # id -> class name
+
+    if r.boxes is not None and len(r.boxes) > 0:
+        for i, box in enumerate(r.boxes):
+            cls_id = int(box.cls.item()) if hasattr(box.cls, "item") else int(box.cls)
+            conf = float(box.conf.item()) if hasattr(box.conf, "item") else float(box.conf)
+            class_name = names.get(cls_id, str(cls_id))
+            
+            if class_name in TARGET_CLASS_TO_LABEL:
+                friendly = TARGET_CLASS_TO_LABEL[class_name]
+                min_conf = MIN_CONFIDENCE.get(friendly, 0.5)
+                
+                # STRICT: Only accept if confidence exceeds threshold
+                if conf >= min_conf:
+                    # Additional validation for Matcha (cup) - check color/brightness
+                    if friendly == "Matcha" and conf >= min_conf:
+                        # Extract ROI and check if it looks greenish (matcha color)
+                        x1, y1, x2, y2 = box.xyxy[0].tolist()
+                        x1, y1, x2, y2 = int(x1), int(y1), int(x2), int(y2)
+                        roi = bgr[max(0, y1):min(bgr.shape[0], y2), max(0, x1):min(bgr.shape[1], x2)]
+                        if roi.size > 0:
+                            # Convert to HSV and check green channel
+                            hsv_roi = cv2.cvtColor(roi, cv2.COLOR_BGR2HSV)
+                            # Matcha is typically green (H: 60-120 in HSV)
+                            green_pixels = np.sum((hsv_roi[:, :, 0] >= 40) & (hsv_roi[:, :, 0] <= 80))
+                            green_ratio = green_pixels / (roi.shape[0] * roi.shape[1]) if roi.size > 0 else 0
+                            # Require at least 15% green pixels to be matcha
+                            if green_ratio < 0.15:
+                                app.logger.debug(f"Rejected cup as matcha (green ratio: {green_ratio:.2f})")
+                                if rejected is not None:
+                                    rejected.add(i)
+                                continue
+                    
+                    # Additional validation for Books - check aspect ratio
+                    if friendly == "Books" and conf >= min_conf:
+                        x1, y1, x2, y2 = box.xyxy[0].tolist()
+                        width = abs(x2 - x1)
+                        height = abs(y2 - y1)
+                        aspect_ratio = width / height if height > 0 else 0
+                        # Books should be rectangular, not too square (avoid false positives)
+                        if aspect_ratio < 0.3 or aspect_ratio > 3.0:
+                            app.logger.debug(f"Rejected book (aspect ratio: {aspect_ratio:.2f})")
+                            if rejected is not None:
+                                rejected.add(i)
+                            continue
+                    
+                    detections.append({
+                        "name": class_name,
+                        "label": friendly,
+                        "confidence": round(conf, 3),
+                    })
+    return detections
+
+
+def earphone_detect(bgr: np.ndarray, _model: None, _wanted: Set[str]) -> List[Dict]:
+    """Custom wired earphone detection (STRICT - only if confidence is high enough)."""
     earphones_detected, earphones_conf = detect_wired_earphones(bgr)
     min_conf_earphones = MIN_CONFIDENCE.get("Wired Earphones", 0.7)  # Raised from 0.5 to 0.7
     if earphones_detected and earphones_conf >= min_conf_earphones:
-        detections.append({
+        return [{
             "name": "wired earphones",
             "label": "Wired Earphones",
             "confidence": round(earphones_conf, 3),
-        })
-        labels_found.add("Wired Earphones")
+        }]
+    return []
+
+
+# Each performative label maps to a pluggable detector. Heavy models load on first use
+# and are evicted least-recently-used once their estimated size exceeds the budget.
+DETECTOR_MEMORY_BUDGET_MB = int(os.environ.get("DETECTOR_MEMORY_BUDGET_MB", "512"))
+DETECTORS = DetectorRegistry(memory_budget_bytes=DETECTOR_MEMORY_BUDGET_MB * 1024 * 1024)
+DETECTORS.register_model("yolov8n", load_model, cost_bytes=120 * 1024 * 1024)
+DETECTORS.register("yolo", TARGET_CLASS_TO_LABEL.values(), yolo_detect, model="yolov8n", cost_ms=250,
+                   detect_batch=yolo_detect_batch, detect_tracked=yolo_detect_tracked,
+                   tracked_mode=yolo_tracked_mode)
+DETECTORS.register("earphones", ["Wired Earphones"], earphone_detect, cost_ms=15)
 
-    return detections, labels_found
+
+def performative_detect(bgr: np.ndarray, labels: Set[str] | None = None) -> Tuple[List[Dict], Set[str]]:
+    """Run the registered detectors on the frame and extract performative detections.
+
+    ``labels`` restricts the run to the detectors needed for those labels (default: all).
+
+    Returns a tuple of:
+      - list of dicts {label, name, confidence}
+      - set of canonical labels detected (e.g., {"Matcha", "Books", "Wired Earphones"})
+    """
+    run = DETECTORS.run(bgr, labels)
+    return run.detections, run.labels
+
+
+# Per CameraModal session: best confidence per label (so later frames only run the
+# detectors for labels that are still missing) and the last /detect result (served when
+# a frame is shed under load). Sessions expire after an idle timeout. They live in
+# STORE together with generated outputs; point PERFORMATIVE_STORE at a shared backend
+# (e.g. sqlite:///path/app.db) when running several workers or instances.
+SESSION_TTL_SECONDS = 15 * 60
+MAX_SESSIONS = 1024
+MAX_SESSION_ID_LENGTH = 128
+OUTPUT_DIR = pathlib.Path("output")
+STORE = open_store(
+    os.environ.get("PERFORMATIVE_STORE", "memory://"),
+    output_dir=OUTPUT_DIR, ttl_seconds=SESSION_TTL_SECONDS, max_sessions=MAX_SESSIONS,
+)
+atexit.register(STORE.close)
+# Tracking state for detect_tracked detectors (templates, boxes); stays in this process
+DETECTOR_STATES = SessionStates(max_sessions=MAX_SESSIONS, ttl_seconds=SESSION_TTL_SECONDS)
+
+
+def parse_session_id(value: Any) -> str | None:
+    """A client-sent session id, or None when it is missing or not a short string."""
+    if isinstance(value, str) and 0 < len(value) <= MAX_SESSION_ID_LENGTH:
+        return value
+    return None
+
+
+def session_scores(session_id: str | None) -> Dict[str, float]:
+    """Best confidence seen so far per label in this session (empty if unknown/expired)."""
+    if not session_id:
+        return {}
+    return STORE.session_scores(session_id)
+
+
+def update_session_scores(session_id: str | None, scores: Dict[str, float]) -> Dict[str, float]:
+    """Merge this frame's per-label confidences into the session and return the result."""
+    if not session_id:
+        return dict(scores)
+    return STORE.merge_scores(session_id, scores)
+
+
+def cache_session_result(session_id: str | None, result: Dict[str, Any]) -> None:
+    if session_id:
+        STORE.set_result(session_id, result)
+
+
+def cached_session_result(session_id: str | None) -> Dict[str, Any] | None:
+    if not session_id:
+        return None
+    return STORE.get_result(session_id)
 
 
 @app.route("/")
 def index():
     """Serve React app index.html"""
-    try:
-        return send_from_directory('frontend/dist', 'index.html')
-    except FileNotFoundError:
-        # Fallback to original template if React build doesn't exist
-        return render_template("index.html")
+    if (FRONTEND_DIST / "index.html").is_file():
+        return _send_frontend_file("index.html")
+    # Fallback to original template if React build doesn't exist
+    return render_template("index.html")
 
 @app.route("/static/<path:filename>")
 def serve_static(filename):
@@ -406,52 +765,135 @@ def serve_static(filename):
     return send_from_directory('static', filename)
 
 
+def detect_and_score(bgr: np.ndarray, session_id: str | None = None, deadline: float | None = None) -> Dict[str, Any]:
+    """Run detection on a decoded frame and build the /detect response body.
+
+    With a ``deadline`` (time.perf_counter() value) detectors that would overrun it are
+    skipped; the body's "detectors" says which ran and "partial" flags skipped ones.
+    """
+    # Labels already found in this session are not re-detected, so with a session
+    # "labels" holds only what was newly found on this frame ("session_labels" has all)
+    missing_labels = DETECTORS.labels() - set(session_scores(session_id))
+
+    with shared_frame(bgr) as frame:
+        del bgr  # with the ring on, its slot is now the only copy
+        state = DETECTOR_STATES.get(session_id) if session_id else None
+        run = DETECTORS.run(frame, missing_labels, deadline, state)
+
+    # Within a session, labels found on earlier frames keep counting
+    unique_scores = update_session_scores(session_id, label_scores(run.detections))
+    result = build_detect_result(run.detections, run.labels, unique_scores)
+    result["detectors"] = {"ran": run.ran, "skipped": run.skipped}
+    result["partial"] = bool(run.skipped)
+    return result
+
+
+def label_scores(detections: List[Dict]) -> Dict[str, float]:
+    """Best confidence per label among the detections."""
+    unique_scores: Dict[str, float] = {}
+    for d in detections:
+        label = d["label"]
+        unique_scores[label] = max(unique_scores.get(label, 0.0), float(d["confidence"]))
+    return unique_scores
+
+
+def build_detect_result(detections: List[Dict], labels: Set[str], unique_scores: Dict[str, float]) -> Dict[str, Any]:
+    """The /detect response body: score and suggestions from the per-label confidences."""
+    # Compute a simple score: sum of confidences for unique labels, scaled to 0-100
+    raw_score = sum(unique_scores.values())  # 0..~N
+    # Score is now: each detected item contributes its confidence (0-1), scaled to 0-100
+    # This means if you detect 1 item at 0.5 confidence, score = 50%
+    # If you detect 2 items at 0.8 confidence each, score = 80%
+    score = int(min(100, max(0, round(raw_score * 100))))
+
+    suggestions: List[str] = []
+    missing = DETECTORS.labels() - set(unique_scores.keys())
+    for m in sorted(missing):
+        if m == "Matcha":
+            suggestions.append("Hold a green drink (matcha) in frame")
+        elif m == "Books":
+            suggestions.append("Show a book (feminist lit even better)")
+        elif m == "Plushie":
+            suggestions.append("Bring a plushie into view")
+        elif m == "Camera":
+            suggestions.append("Show a camera")
+        elif m == "Wired Earphones":
+            suggestions.append("Wear wired earphones (visible in the upper frame)")
+
+    return {
+        "ok": True,
+        "detected": detections,
+        "labels": sorted(list(labels)),
+        "session_labels": sorted(unique_scores),
+        "score": score,
+        "suggestions": suggestions,
+        "ready": DETECTION_READY,
+    }
+
+
+# Polling frames are shed once inference falls behind; sign-in conversions
+# (render_performative_overlay) are priority work with a reserved slot. Batch and clip
+# scoring hold a background slot per detector batch, waiting for one when busy, so
+# /detect clients are slowed down (poll_interval_ms) while bulk jobs run.
+ADMISSION = AdmissionController(
+    max_inflight=int(os.environ.get("DETECT_MAX_INFLIGHT", "2")),
+    priority_reserve=1,
+)
+
+
+def _shed_detect_response(session_id: str | None):
+    """Answer a frame we had no capacity for: last result if we have one, else 503."""
+    interval = ADMISSION.poll_interval_ms()
+    cached = cached_session_result(session_id)
+    if cached is not None:
+        resp = jsonify({**cached, "stale": True, "poll_interval_ms": interval})
+    else:
+        resp = jsonify({
+            "ok": False,
+            "error": "Detector busy, try again shortly",
+            "detected": [],
+            "labels": [],
+            "score": 0,
+            "suggestions": [],
+            "ready": DETECTION_READY,
+            "poll_interval_ms": interval,
+        })
+        resp.status_code = 503
+    resp.headers["Retry-After"] = str(max(1, round(interval / 1000)))
+    return resp
+
+
+# Time budget for one /detect frame, counted from request arrival; it keeps answers
+# inside CameraModal's 400 ms polling cadence. Clients may ask for less (budget_ms).
+DETECT_BUDGET_MS = int(os.environ.get("DETECT_BUDGET_MS", "300"))
+
+
 @app.route("/detect", methods=["POST"])
 def detect():
+    arrived = time.perf_counter()
     try:
         payload = request.get_json(force=True, silent=False)
         data_url = payload.get("image") if isinstance(payload, dict) else None
         if not data_url:
             return jsonify({"ok": False, "error": "Missing image", "detected": [], "labels": [], "score": 0, "suggestions": [], "ready": DETECTION_READY}), 400
 
-        bgr = parse_data_url_to_bgr(data_url)
-        detections, labels = performative_detect(bgr)
-
-        # Compute a simple score: sum of confidences for unique labels, scaled to 0-100
-        unique_scores: Dict[str, float] = {}
-        for d in detections:
-            label = d["label"]
-            unique_scores[label] = max(unique_scores.get(label, 0.0), float(d["confidence"]))
-        raw_score = sum(unique_scores.values())  # 0..~N
-        # Score is now: each detected item contributes its confidence (0-1), scaled to 0-100
-        # This means if you detect 1 item at 0.5 confidence, score = 50%
-        # If you detect 2 items at 0.8 confidence each, score = 80%
-        score = int(min(100, max(0, round(raw_score * 100))))
-
-        suggestions: List[str] = []
-        all_target_labels = set(TARGET_CLASS_TO_LABEL.values()) | {"Wired Earphones"}
-        missing = all_target_labels - set(unique_scores.keys())
-        for m in sorted(missing):
-            if m == "Matcha":
-                suggestions.append("Hold a green drink (matcha) in frame")
-            elif m == "Books":
-                suggestions.append("Show a book (feminist lit even better)")
-            elif m == "Plushie":
-                suggestions.append("Bring a plushie into view")
-            elif m == "Camera":
-                suggestions.append("Show a camera")
-            elif m == "Wired Earphones":
-                suggestions.append("Wear wired earphones (visible in the upper frame)")
-
-        
-        return jsonify({
-            "ok": True,
-            "detected": detections,
-            "labels": sorted(list(labels)),
-            "score": score,
-            "suggestions": suggestions,
-            "ready": DETECTION_READY,
-        })
+        # Optional CameraModal session id (see session_scores)
+        session_id = parse_session_id(payload.get("session"))
+        if not ADMISSION.try_admit():
+            return _shed_detect_response(session_id)
+        budget_ms = DETECT_BUDGET_MS
+        if isinstance(payload.get("budget_ms"), (int, float)) and payload["budget_ms"] > 0:
+            budget_ms = min(budget_ms, payload["budget_ms"])
+        started = time.perf_counter()
+        try:
+            result = detect_and_score(parse_data_url_to_bgr(data_url), session_id, arrived + budget_ms / 1000)
+        finally:
+            ADMISSION.done(time.perf_counter() - started)
+
+        cache_session_result(session_id, result)
+        return jsonify({**result, "poll_interval_ms": ADMISSION.poll_interval_ms()})
+    except RequestEntityTooLarge as e:
+        return _too_large_response(e, detected=[], labels=[], score=0, suggestions=[], ready=DETECTION_READY)
     except Exception as e:
         app.logger.error(f"Detection error: {e}", exc_info=True)
         return jsonify({
@@ -465,6 +907,269 @@ def detect():
         }), 500
 
 
+# Bulk scoring (/detect_batch and batch.py). Images are read and decoded on a thread
+# pool (cv2 releases the GIL) and detected BATCH_SIZE at a time, so at most two batches
+# are in memory while results stream out.
+BATCH_SIZE = int(os.environ.get("DETECT_BATCH_SIZE", "8"))
+BATCH_DECODE_WORKERS = min(4, os.cpu_count() or 1)
+IMAGE_SUFFIXES = frozenset({".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff"})
+
+BatchItem = Tuple[str, Callable[[], IO[bytes]]]
+
+
+def _read_bounded(opener: Callable[[], IO[bytes]]) -> bytes:
+    """Read one image file, refusing anything over MAX_IMAGE_BYTES."""
+    with opener() as f:
+        data = f.read(MAX_IMAGE_BYTES + 1)
+    if len(data) > MAX_IMAGE_BYTES:
+        raise ImageTooLarge(f"Image exceeds {MAX_IMAGE_BYTES // (1024 * 1024)} MB")
+    return data
+
+
+def iter_directory_images(root: pathlib.Path) -> Iterator[BatchItem]:
+    """(relative name, opener) for every image under ``root``, in sorted order."""
+    root = pathlib.Path(root)
+    for path in sorted(root.rglob("*")):
+        if path.suffix.lower() in IMAGE_SUFFIXES and path.is_file():
+            yield path.relative_to(root).as_posix(), functools.partial(open, path, "rb")
+
+
+def iter_zip_images(archive: zipfile.ZipFile) -> Iterator[BatchItem]:
+    """(member name, opener) for every image in a zip archive."""
+    for info in archive.infolist():
+        if not info.is_dir() and pathlib.PurePosixPath(info.filename).suffix.lower() in IMAGE_SUFFIXES:
+            yield info.filename, functools.partial(archive.open, info)
+
+
+def _load_batch_frame(opener: Callable[[], IO[bytes]]) -> np.ndarray:
+    return decode_bgr(_read_bounded(opener), DETECT_MAX_SIDE)
+
+
+def score_images(items: Iterable[BatchItem], batch_size: int = BATCH_SIZE,
+                 workers: int = BATCH_DECODE_WORKERS) -> Iterator[Dict[str, Any]]:
+    """Score images with the /detect logic, yielding one result per image in input order.
+
+    Each result is the /detect body plus ``file``; unreadable images yield
+    ``{file, ok: False, error}`` instead of stopping the run.
+    """
+    items = iter(items)
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="batch-decode") as pool:
+        def submit_next_batch():
+            return [(name, pool.submit(_load_batch_frame, opener)) for name, opener in islice(items, batch_size)]
+
+        pending = submit_next_batch()
+        while pending:
+            frames: List[np.ndarray] = []
+            slots: List[Tuple[str, int | str]] = []
+            for name, future in pending:
+                try:
+                    frames.append(future.result())
+                    slots.append((name, len(frames) - 1))
+                except Exception as e:
+                    slots.append((name, getattr(e, "description", None) or str(e)))
+            # Decode the next batch while this one goes through the detectors
+            pending = submit_next_batch()
+
+            detected = []
+            if frames:
+                with ADMISSION.admit(wait=True):
+                    detected = DETECTORS.run_batch(frames)
+            for name, slot in slots:
+                if isinstance(slot, str):
+                    yield {"file": name, "ok": False, "error": slot}
+                    continue
+                detections, labels = detected[slot]
+                yield {"file": name, **build_detect_result(detections, labels, label_scores(detections))}
+            del frames, detected
+
+
+def _detach_upload(storage) -> IO[bytes]:
+    """Take an uploaded file's stream so it outlives the request (which closes its files)."""
+    stream, storage.stream = storage.stream, io.BytesIO()
+    return stream
+
+
+@app.route("/detect_batch", methods=["POST"])
+def detect_batch():
+    """Score a photo archive: multipart "archive" (.zip) or one or more "images" files.
+
+    Streams JSON Lines (application/x-ndjson): one /detect-style result per image,
+    with an extra "file" key.
+    """
+    try:
+        archive = request.files.get("archive")
+        uploads = request.files.getlist("images")
+    except RequestEntityTooLarge as e:
+        return _too_large_response(e)
+    if archive is not None:
+        stream = _detach_upload(archive)
+        try:
+            items = iter_zip_images(zipfile.ZipFile(stream))
+        except zipfile.BadZipFile:
+            stream.close()
+            return jsonify({"ok": False, "error": "archive is not a valid .zip file"}), 400
+        streams = [stream]
+    elif uploads:
+        streams = [_detach_upload(f) for f in uploads]
+        items = [(f.filename or f"image_{i}", lambda s=s: s) for i, (f, s) in enumerate(zip(uploads, streams))]
+    else:
+        return jsonify({"ok": False, "error": "Upload an 'archive' (.zip) or one or more 'images'"}), 400
+
+    response = Response((json.dumps(result) + "\n" for result in score_images(items)), mimetype="application/x-ndjson")
+    for stream in streams:
+        response.call_on_close(stream.close)
+    return response
+
+
+# Clip scoring (/detect_clip). Frames are pulled from cv2.VideoCapture one at a time:
+# skipped frames are only grab()bed, and at most one detector batch of sampled frames
+# is decoded at once. Sampling goes by each frame's timestamp (CAP_PROP_POS_MSEC), not
+# by frame index: browser recordings are variable frame rate and often report a bogus
+# CAP_PROP_FPS. Once the picture has been static for a few samples the interval
+# between them doubles, up to one second, and it snaps back as soon as anything moves.
+CLIP_MAX_BYTES = 64 * 1024 * 1024
+CLIP_MAX_SECONDS = 30
+CLIP_SAMPLE_FPS = 4
+# A frame is detected at least this often, near-duplicate or not
+CLIP_MIN_SAMPLE_FPS = 1
+CLIP_MAX_SAMPLES = 48
+# Near-duplicate: no cell of the 32x32 colour thumbnails differs by more than this
+# (0-255). A per-cell max rather than a mean, so a small object entering a still
+# scene counts as a change.
+CLIP_DUPLICATE_THRESHOLD = 12
+# The interval only grows after this many near-duplicates in a row
+CLIP_STILL_FRAMES = 2
+# Frame rates outside this range are container noise; timestamps are used instead
+CLIP_PLAUSIBLE_FPS = (1.0, 240.0)
+# Timestamps are in whole milliseconds in some containers
+_CLIP_TIME_SLACK_S = 0.002
+
+
+def _clip_signature(frame: np.ndarray) -> np.ndarray:
+    return cv2.resize(frame, (32, 32), interpolation=cv2.INTER_AREA).astype(np.int16)
+
+
+def sample_clip_frames(capture: "cv2.VideoCapture", stats: Dict[str, Any],
+                       max_side: int = DETECT_MAX_SIDE) -> Iterator[Tuple[float, np.ndarray]]:
+    """Yield (timestamp seconds, BGR frame) for distinct frames sampled from a clip.
+
+    ``stats`` is filled in with frames read, samples taken and duplicates skipped.
+    """
+    fps = capture.get(cv2.CAP_PROP_FPS)
+    if not CLIP_PLAUSIBLE_FPS[0] <= fps <= CLIP_PLAUSIBLE_FPS[1]:
+        fps = 0.0
+    total = capture.get(cv2.CAP_PROP_FRAME_COUNT)
+    duration = min(CLIP_MAX_SECONDS, total / fps) if fps and total > 0 else CLIP_MAX_SECONDS
+    # Spread the sample budget over the whole clip when it is long (or of unknown length)
+    base_interval = max(1 / CLIP_SAMPLE_FPS, duration / CLIP_MAX_SAMPLES)
+    max_gap = max(base_interval, 1 / CLIP_MIN_SAMPLE_FPS)
+    interval, next_t, kept_t, t, still = base_interval, 0.0, 0.0, 0.0, 0
+    last_signature = None
+    stats.update(fps=round(fps, 2) or None, frames_read=0, sampled=0, duplicates=0)
+
+    while stats["sampled"] < CLIP_MAX_SAMPLES:
+        if not capture.grab():
+            break
+        position_ms = capture.get(cv2.CAP_PROP_POS_MSEC)
+        # Some backends report no position; fall back to the frame index
+        t = position_ms / 1000 if position_ms > 0 else stats["frames_read"] / (fps or 30.0)
+        stats["frames_read"] += 1
+        if t > CLIP_MAX_SECONDS:
+            break
+        if t + _CLIP_TIME_SLACK_S < next_t:
+            continue
+        ok, frame = capture.retrieve()
+        if not ok or frame is None:
+            break
+        signature = _clip_signature(frame)
+        if (last_signature is not None and t - kept_t + _CLIP_TIME_SLACK_S < max_gap
+                and np.abs(signature - last_signature).max() <= CLIP_DUPLICATE_THRESHOLD):
+            stats["duplicates"] += 1
+            still += 1
+            if still >= CLIP_STILL_FRAMES:
+                interval = min(interval * 2, max_gap)
+            next_t = min(t + interval, kept_t + max_gap)
+            continue
+        last_signature, kept_t, interval, still = signature, t, base_interval, 0
+        next_t = t + interval
+
+        h, w = frame.shape[:2]
+        if max(h, w) > max_side:
+            scale = max_side / max(h, w)
+            frame = cv2.resize(frame, (round(w * scale), round(h * scale)), interpolation=cv2.INTER_AREA)
+        stats["sampled"] += 1
+        yield t, frame
+    stats["duration_s"] = round(t, 2)
+
+
+def score_clip(path: str, session_id: str | None = None, batch_size: int = BATCH_SIZE) -> Dict[str, Any]:
+    """Best performative score over a video clip, in the /detect response shape.
+
+    Per label, the highest-confidence detection across all sampled frames is kept
+    (with its timestamp ``t`` in seconds).
+    """
+    capture = cv2.VideoCapture(path)
+    if not capture.isOpened():
+        raise ValueError("Could not read video")
+    stats: Dict[str, Any] = {}
+    best: Dict[str, Dict] = {}
+    try:
+        samples = sample_clip_frames(capture, stats)
+        while True:
+            batch = list(islice(samples, batch_size))
+            if not batch:
+                break
+            with ADMISSION.admit(wait=True):
+                detected = DETECTORS.run_batch([frame for _, frame in batch])
+            for (t, _), (detections, _) in zip(batch, detected):
+                for d in detections:
+                    if d["confidence"] > best.get(d["label"], {}).get("confidence", -1.0):
+                        best[d["label"]] = {**d, "t": round(t, 2)}
+            del batch, detected
+    finally:
+        capture.release()
+    if not stats.get("sampled"):
+        raise ValueError("Could not read video")
+
+    detections = sorted(best.values(), key=lambda d: d["t"])
+    unique_scores = update_session_scores(session_id, label_scores(detections))
+    result = build_detect_result(detections, set(best), unique_scores)
+    result["clip"] = stats
+    cache_session_result(session_id, result)
+    return result
+
+
+@app.route("/detect_clip", methods=["POST"])
+def detect_clip():
+    """Score a short recorded clip (multipart "video"; optional "session" field).
+
+    Returns the /detect body with per-label best confidences over the clip, plus a
+    "clip" object with sampling stats.
+    """
+    try:
+        video = request.files.get("video")
+    except RequestEntityTooLarge as e:
+        return _too_large_response(e)
+    if video is None:
+        return jsonify({"ok": False, "error": "Upload a 'video' file"}), 400
+    suffix = pathlib.Path(video.filename or "").suffix or ".mp4"
+    # VideoCapture wants a path; werkzeug already spooled the upload to disk
+    with tempfile.NamedTemporaryFile(suffix=suffix, delete=False) as tmp:
+        video.save(tmp)
+    try:
+        return jsonify(score_clip(tmp.name, parse_session_id(request.form.get("session"))))
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    except cv2.error as e:
+        app.logger.warning(f"Could not decode clip: {e}")
+        return jsonify({"ok": False, "error": "Could not read video"}), 400
+    except Exception as e:
+        app.logger.error(f"Clip scoring failed: {e}", exc_info=True)
+        return jsonify({"ok": False, "error": str(e)}), 500
+    finally:
+        os.unlink(tmp.name)
+
+
 @app.route("/gemini", methods=["POST"])
 def gemini_transform():
     """Send captured image to Gemini for performative transformation analysis."""
@@ -484,17 +1189,8 @@ def gemini_transform():
                 "error": f"Gemini API not configured. GEMINI_READY={GEMINI_READY}, MODEL={GEMINI_MODEL is not None}"
             }), 503
 
-        # Parse image
-        if "," in data_url:
-            base64_part = data_url.split(",", 1)[1]
-        else:
-            base64_part = data_url
-        binary = base64.b64decode(base64_part)
-        
-        # Convert to PIL Image for Gemini
-        img_bytes = io.BytesIO(binary)
-        pil_img = Image.open(img_bytes)
-        pil_img = pil_img.convert("RGB")
+        # Parse image straight to a PIL Image for Gemini
+        pil_img = parse_data_url_to_pil(data_url, GEMINI_MAX_SIDE)
 
         # Reference prompt based on the "Performative male final boss" aesthetic
         prompt = """You are analyzing an image for a performative transformation. Based on the aesthetic of "performative male" culture which includes:
@@ -532,6 +1228,8 @@ Return a JSON object with:
             "response": response_text,
             "ready": True
         })
+    except RequestEntityTooLarge as e:
+        return _too_large_response(e)
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
@@ -581,22 +1279,100 @@ If clothing occludes, adapt (e.g., tote in foreground, earbud wire across chest)
 Return only the edited image."""
 
 
-OUTPUT_DIR = pathlib.Path("output")
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+# How generated images are returned to the client:
+#   json   - legacy { ok, image: <data-url> } (base64 inside JSON)
+#   url    - { ok, image: "/outputs/<file>", saved_url } - no image bytes in the body
+#   binary - the raw image bytes, with the saved URL (if any) in X-Saved-Url
+RESPONSE_MODES = ("json", "url", "binary")
+
+
+# _save_output names are <prefix>_<unix time>_<sha1[:10]>.<ext>; only those are safe
+# to cache forever (older or hand-placed outputs are revalidated)
+HASHED_OUTPUT_RE = re.compile(r"^[A-Za-z0-9-]+_[0-9]+_[0-9a-f]{10}\.[A-Za-z0-9]+$")
+
+
+def _save_output(image_bytes: bytes, ext: str = "png", prefix: str = "performative") -> str:
+    """Put a generated image in STORE and return its filename."""
+    digest = hashlib.sha1(image_bytes).hexdigest()[:10]
+    filename = f"{prefix}_{int(time.time())}_{digest}.{ext}"
+    STORE.put_output(filename, image_bytes)
+    return filename
+
+
+def _send_output(filename: str, mimetype: str | None = None):
+    """Response for a stored output: streamed from disk when local, else from STORE."""
+    path = STORE.local_path(filename)
+    if path is not None:
+        return send_from_directory(path.parent.as_posix(), path.name, mimetype=mimetype)
+    data = STORE.get_output(filename)
+    if data is None:
+        raise NotFound()
+    # Hashed names double as ETags
+    etag = filename if HASHED_OUTPUT_RE.match(filename) else hashlib.sha1(data).hexdigest()
+    return send_file(
+        io.BytesIO(data), mimetype=mimetype or mimetypes.guess_type(filename)[0] or "application/octet-stream",
+        etag=etag, conditional=True,
+    )
+
+
+def _response_mode(payload) -> str:
+    """Pick the response mode from ?response=... or the JSON body, defaulting to json."""
+    mode = request.args.get("response")
+    if not mode and isinstance(payload, dict):
+        mode = payload.get("response")
+    return mode if mode in RESPONSE_MODES else "json"
+
+
+def _image_response(image_bytes: bytes, mimetype: str, mode: str, filename: str | None = None,
+                    image_b64: str | None = None, key: str = "image", prefix: str = "overlay"):
+    """Return a generated image in the requested response mode.
+
+    ``filename`` is an already-saved output (see _save_output); in url mode the image is
+    saved on demand under ``prefix``, which defaults to one that /outputs/latest (the
+    "performative_" Gemini images) does not pick up. ``image_b64`` lets callers that
+    already hold base64 skip re-encoding.
+    """
+    if mode == "url":
+        if filename is None:
+            filename = _save_output(image_bytes, ext=mimetype.split("/", 1)[1].replace("jpeg", "jpg"), prefix=prefix)
+        saved_url = f"/outputs/{filename}"
+        return jsonify({"ok": True, key: saved_url, "saved_url": saved_url})
+
+    if mode == "binary":
+        if filename is not None:
+            resp = _send_output(filename, mimetype)
+            resp.headers["X-Saved-Url"] = f"/outputs/{filename}"
+        else:
+            resp = send_file(io.BytesIO(image_bytes), mimetype=mimetype)
+        resp.headers["Cache-Control"] = "no-store"
+        return resp
+
+    if image_b64 is None:
+        image_b64 = base64.b64encode(image_bytes).decode("ascii")
+    body = {"ok": True, key: f"data:{mimetype};base64,{image_b64}"}
+    if filename is not None:
+        body["saved_url"] = f"/outputs/{filename}"
+    return jsonify(body)
 
 
 @app.route("/outputs/<path:filename>")
 def serve_output_file(filename: str):
-    return send_from_directory(OUTPUT_DIR.as_posix(), filename)
+    # Content-hashed names can be cached forever; anything else is revalidated
+    # (_send_output handles ETag / If-None-Match)
+    resp = _send_output(filename)
+    if HASHED_OUTPUT_RE.match(filename):
+        resp.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    else:
+        resp.headers["Cache-Control"] = "no-cache"
+    return resp
 
 
 @app.route("/outputs/latest")
 def latest_output():
     try:
-        files = sorted(OUTPUT_DIR.glob("performative_*.png"), key=lambda p: p.stat().st_mtime, reverse=True)
-        if not files:
+        latest = STORE.latest_output("performative_")
+        if latest is None:
             return jsonify({"ok": False, "error": "No outputs yet"}), 404
-        latest = files[0].name
         return jsonify({"ok": True, "filename": latest, "url": f"/outputs/{latest}"})
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
@@ -607,26 +1383,29 @@ def gemini_convert():
     """Ask Gemini to return an edited image: 'performative male final boss' conversion.
 
     Input JSON:
-      { image: <data-url>, task_hint: <optional specific instructions> }
+      { image: <data-url>, task_hint: <optional specific instructions>, response: <optional mode> }
 
     Returns:
       { ok: true, image: <data-url PNG> } or falls back to performative_convert.
+      With response=url / response=binary see RESPONSE_MODES.
     """
+    mode = "json"
     try:
         payload = request.get_json(force=True, silent=False)
         data_url = payload.get("image") if isinstance(payload, dict) else None
         task_hint = payload.get("task_hint", "")
+        mode = _response_mode(payload)
         if not data_url:
             return jsonify({"ok": False, "error": "Missing image"}), 400
 
-        # Use the module-level API key (includes fallback)
-        api_key_to_use = GEMINI_API_KEY
-        
         # Re-check at request time - if still not ready, try to reinitialize
         if not GEMINI_READY:
             app.logger.info("Gemini not ready, attempting to reinitialize...")
             init_gemini()
         
+        # Use the module-level API key (includes fallback)
+        api_key_to_use = GEMINI_API_KEY
+        
         if not GEMINI_READY or not api_key_to_use:
             app.logger.error(f"Gemini not ready - GEMINI_READY={GEMINI_READY}, API_KEY_SET={bool(api_key_to_use)}")
             return jsonify({
@@ -634,12 +1413,9 @@ def gemini_convert():
                 "error": f"Gemini API not configured. GEMINI_READY={GEMINI_READY}, KEY_SET={bool(api_key_to_use)}"
             }), 503
 
-        # Parse image
-        if "," in data_url:
-            base64_part = data_url.split(",", 1)[1]
-        else:
-            base64_part = data_url
-        binary = base64.b64decode(base64_part)
+        # Parse image (Gemini gets the original bytes, only the pixel count is checked here)
+        binary = decode_data_url(data_url)
+        _image_header(binary)
         
         # Build prompt with optional task hint
         prompt = PERFORMATIVE_IMAGE_STYLIST_PROMPT
@@ -683,15 +1459,11 @@ def gemini_convert():
                             app.logger.info("✅ Gemini image conversion successful - returning transformed image")
                             # Save to outputs folder
                             binary_out = base64.b64decode(image_b64)
-                            ts = int(time.time())
-                            filename = f"performative_{ts}.png"
-                            (OUTPUT_DIR / filename).write_bytes(binary_out)
-                            saved_url = f"/outputs/{filename}"
-                            return jsonify({
-                                "ok": True,
-                                "image": f"data:image/png;base64,{image_b64}",
-                                "saved_url": saved_url,
-                            })
+                            filename = _save_output(binary_out)
+                            return _image_response(
+                                binary_out, "image/png", mode, filename=filename,
+                                image_b64=image_b64 if mode == "json" else None,
+                            )
             
             app.logger.warning("Gemini response OK but no image found in candidates")
         else:
@@ -699,36 +1471,27 @@ def gemini_convert():
 
         # Fallback to local overlay conversion if REST call fails or no image returned
         app.logger.warning("Gemini didn't return image, falling back to local conversion")
-        base64_part = data_url.split(",", 1)[1] if "," in data_url else data_url
-        binary = base64.b64decode(base64_part)
-        img_bytes = io.BytesIO(binary)
-        pil_img = Image.open(img_bytes).convert("RGBA")
-        out = _draw_performative_overlay(pil_img)
+        pil_img = decode_pil(binary, CONVERT_MAX_SIDE, "RGBA")
+        out = render_performative_overlay(pil_img)
         buf = io.BytesIO()
         out.convert("RGBA").save(buf, format="PNG")
         png_bytes = buf.getvalue()
         # Save fallback to outputs as well
-        ts = int(time.time())
-        filename = f"performative_{ts}.png"
-        (OUTPUT_DIR / filename).write_bytes(png_bytes)
-        saved_url = f"/outputs/{filename}"
-        b64 = base64.b64encode(png_bytes).decode("ascii")
-        return jsonify({"ok": True, "image": f"data:image/png;base64,{b64}", "saved_url": saved_url})
+        filename = _save_output(png_bytes)
+        return _image_response(png_bytes, "image/png", mode, filename=filename)
 
+    except RequestEntityTooLarge as e:
+        return _too_large_response(e)
     except Exception as e:
         app.logger.error(f"Gemini conversion failed: {e}", exc_info=True)
         # Fallback to local overlay on error
         try:
             if 'data_url' in locals() and data_url:
-                base64_part = data_url.split(",", 1)[1] if "," in data_url else data_url
-                binary = base64.b64decode(base64_part)
-                img_bytes = io.BytesIO(binary)
-                pil_img = Image.open(img_bytes).convert("RGBA")
-                out = _draw_performative_overlay(pil_img)
+                pil_img = parse_data_url_to_pil(data_url, CONVERT_MAX_SIDE, "RGBA")
+                out = render_performative_overlay(pil_img)
                 buf = io.BytesIO()
                 out.convert("RGB").save(buf, format="JPEG", quality=90)
-                b64 = base64.b64encode(buf.getvalue()).decode("ascii")
-                return jsonify({"ok": True, "image": f"data:image/jpeg;base64,{b64}"})
+                return _image_response(buf.getvalue(), "image/jpeg", mode)
         except Exception as fallback_err:
             app.logger.error(f"Fallback conversion also failed: {fallback_err}")
         return jsonify({"ok": False, "error": str(e)}), 500
@@ -739,24 +1502,22 @@ def generate_gif():
     """Create a short animated GIF based on the captured image.
 
     This simulates a performative dance by gently translating/rotating the image and
-    overlaying a few aesthetic emojis. Returns a data URL for the GIF.
+    overlaying a few aesthetic emojis. Returns a data URL for the GIF (or a URL / raw
+    bytes, see RESPONSE_MODES).
     """
     try:
         payload = request.get_json(force=True, silent=False)
         data_url = payload.get("image") if isinstance(payload, dict) else None
         if not data_url:
             return jsonify({"ok": False, "error": "Missing image"}), 400
+        mode = _response_mode(payload)
 
-        # Decode image
-        base64_part = data_url.split(",", 1)[1] if "," in data_url else data_url
-        binary = base64.b64decode(base64_part)
-        pil_img = Image.open(io.BytesIO(binary)).convert("RGBA")
+        # Decode image directly at thumbnail size
+        img = parse_data_url_to_pil(data_url, GIF_MAX_SIDE, "RGBA")
 
         # Prepare canvas
         target_size = (400, 400)
         bg = Image.new("RGBA", target_size, (16, 18, 32, 255))
-        img = pil_img.copy()
-        img.thumbnail((320, 320))
 
         # Precompute positions
         center_x = target_size[0] // 2
@@ -804,10 +1565,11 @@ def generate_gif():
         # Save to GIF bytes
         out_buf = io.BytesIO()
         frames[0].save(out_buf, format="GIF", save_all=True, append_images=frames[1:], duration=60, loop=0, disposal=2)
-        gif_b64 = base64.b64encode(out_buf.getvalue()).decode("ascii")
-        data_url_out = f"data:image/gif;base64,{gif_b64}"
-
-        return jsonify({"ok": True, "gif": data_url_out})
+        gif_bytes = out_buf.getvalue()
+        filename = _save_output(gif_bytes, ext="gif", prefix="dance") if mode == "url" else None
+        return _image_response(gif_bytes, "image/gif", mode, filename=filename, key="gif")
+    except RequestEntityTooLarge as e:
+        return _too_large_response(e)
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
@@ -816,9 +1578,12 @@ def generate_gif():
 def test():
     """Test endpoint to verify model is loaded"""
     return jsonify({
-        "model_loaded": MODEL is not None,
+        "model_loaded": DETECTORS.is_loaded("yolov8n"),
+        "loaded_models": DETECTORS.loaded(),
         "detection_ready": DETECTION_READY,
-        "yolo_available": YOLO is not None,
+        "yolo_available": YOLO_AVAILABLE,
+        "admission": ADMISSION.stats(),
+        "store": STORE.name,
     })
 
 
@@ -840,133 +1605,136 @@ def games_pacman():
     return render_template("pacman.html")
 
 
+def _send_frontend_file(path: str):
+    """Serve a file from the React build, preferring a precompressed variant.
+
+    Picks the .br/.gz sibling when the client accepts that encoding, marks hashed
+    assets immutable and leaves everything else to ETag/304 revalidation.
+    """
+    mimetype = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+        if request.accept_encodings[encoding] and (FRONTEND_DIST / (path + suffix)).is_file():
+            resp = send_from_directory(FRONTEND_DIST.as_posix(), path + suffix, mimetype=mimetype)
+            resp.headers["Content-Encoding"] = encoding
+            break
+    else:
+        resp = send_from_directory(FRONTEND_DIST.as_posix(), path, mimetype=mimetype)
+    resp.vary.add("Accept-Encoding")
+    if HASHED_ASSET_RE.match(path):
+        resp.headers["Cache-Control"] = IMMUTABLE_CACHE_CONTROL
+    else:
+        resp.headers["Cache-Control"] = "no-cache"
+    return resp
+
+
 @app.route("/<path:path>")
 def serve_react(path):
     """Serve React app static files - must be last route"""
     # Skip API routes
-    api_routes = ['detect', 'gemini', 'gemini_convert', 'generate_gif', 'performative_convert', 'test', 'play', 'games/matcha', 'games/pacman']
+    api_routes = ['detect', 'detect_batch', 'detect_clip', 'gemini', 'gemini_convert', 'generate_gif', 'performative_convert', 'test', 'play', 'games/matcha', 'games/pacman']
     if path in api_routes:
         return jsonify({"error": "Route already handled"}), 404
     # Skip static files (handled by /static/ route)
     if path.startswith('static/'):
         return jsonify({"error": "Use /static/ path for static files"}), 404
-    try:
-        return send_from_directory('frontend/dist', path)
-    except FileNotFoundError:
-        # If file doesn't exist, serve index.html for client-side routing
-        try:
-            return send_from_directory('frontend/dist', 'index.html')
-        except FileNotFoundError:
-            return jsonify({"error": "React build not found. Run 'npm run build' in frontend/"}), 404
+    if safe_join(FRONTEND_DIST.as_posix(), path) and (FRONTEND_DIST / path).is_file():
+        return _send_frontend_file(path)
+    # If file doesn't exist, serve index.html for client-side routing
+    if (FRONTEND_DIST / "index.html").is_file():
+        return _send_frontend_file("index.html")
+    return jsonify({"error": "React build not found. Run 'npm run build' in frontend/"}), 404
 
 
-def _draw_performative_overlay(pil_img: Image.Image) -> Image.Image:
-    """Overlay performative items using simple geometry relative to detected face.
+def render_performative_overlay(pil_img: Image.Image) -> Image.Image:
+    """Sign-in conversion: composite the overlay as priority work so polling frames back off."""
+    with ADMISSION.admit(priority=True):
+        return overlay.compose(pil_img)
 
-    Uses OpenCV Haar cascade to find a face box, then draws:
-    - Glasses across upper face
-    - Wired earphones near ears with thin wires
-    - Tote strap across shoulder
-    - Matcha cup near lower-right of face
-    - Overalls bib and straps on chest
-    """
-    # Convert to BGR for detection
-    rgb = pil_img.convert("RGB")
-    bgr = cv2.cvtColor(np.array(rgb), cv2.COLOR_RGB2BGR)
-
-    # Load default frontal face cascade
-    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
-    gray = cv2.cvtColor(bgr, cv2.COLOR_BGR2GRAY)
-    faces = cascade.detectMultiScale(gray, scaleFactor=1.1, minNeighbors=5, minSize=(60, 60))
-
-    draw = ImageDraw.Draw(rgb, 'RGBA')
-    W, H = rgb.size
 
-    # If no face, assume center region
-    if len(faces) == 0:
-        fx, fy, fw, fh = int(W*0.35), int(H*0.25), int(W*0.3), int(H*0.3)
-    else:
-        # Choose the largest face
-        fx, fy, fw, fh = max(list(faces), key=lambda r: r[2] * r[3])
-
-    # Glasses
-    glasses_y = fy + int(fh * 0.35)
-    glasses_h = max(6, int(fh * 0.08))
-    glasses_pad = int(fw * 0.05)
-    draw.rounded_rectangle(
-        [(fx - glasses_pad, glasses_y), (fx + fw + glasses_pad, glasses_y + glasses_h)],
-        radius=glasses_h//2,
-        fill=(255, 255, 255, 140)
-    )
-    # Bridge
-    bridge_x = fx + fw // 2 - 6
-    draw.rectangle([(bridge_x, glasses_y), (bridge_x + 12, glasses_y + glasses_h)], fill=(220, 220, 220, 180))
-
-    # Wired earphones (left/right buds + thin wire)
-    ear_r = max(3, int(fh * 0.06))
-    left_ear = (fx - int(ear_r*1.2), fy + int(fh*0.45))
-    right_ear = (fx + fw + int(ear_r*1.2), fy + int(fh*0.45))
-    for ex, ey in (left_ear, right_ear):
-        draw.ellipse([(ex-ear_r, ey-ear_r), (ex+ear_r, ey+ear_r)], fill=(255,255,255,230))
-        # wire downward
-        draw.line([(ex, ey+ear_r), (ex+int((W/2-ex)*0.1), ey + ear_r + int(H*0.15))], fill=(240,240,240,220), width=2)
-
-    # Tote strap (diagonal across left shoulder)
-    shoulder_y = fy + fh + int(fh*0.2)
-    draw.line([(fx + int(fw*0.15), shoulder_y - 10), (fx + int(fw*0.45), shoulder_y + int(H*0.18))], fill=(245,245,245,220), width=6)
-
-    # Matcha cup (simple rounded rect with straw) near right lower area
-    cup_w = max(30, int(fw*0.28))
-    cup_h = int(cup_w*1.3)
-    cx = min(W - cup_w - 10, fx + fw + int(fw*0.1))
-    cy = min(H - cup_h - 10, fy + fh + int(fh*0.2))
-    draw.rounded_rectangle([(cx, cy), (cx+cup_w, cy+cup_h)], radius=10, fill=(122, 201, 138, 220), outline=(200,255,210,240))
-    # lid
-    draw.rectangle([(cx-4, cy-8), (cx+cup_w+4, cy)], fill=(235, 235, 235, 230))
-    # straw
-    draw.rectangle([(cx+cup_w//2-3, cy-24), (cx+cup_w//2+3, cy)], fill=(40, 120, 40, 230))
-
-    # Overalls bib & straps
-    chest_top = fy + fh + int(fh*0.05)
-    bib_w = int(fw*0.9)
-    bib_h = int(fh*0.6)
-    bib_x = fx + fw//2 - bib_w//2
-    bib_y = chest_top
-    draw.rounded_rectangle([(bib_x, bib_y), (bib_x+bib_w, bib_y+bib_h)], radius=12, fill=(30, 60, 110, 180))
-    # straps
-    draw.line([(bib_x+10, bib_y), (fx, fy+int(fh*0.5))], fill=(30,60,110,200), width=10)
-    draw.line([(bib_x+bib_w-10, bib_y), (fx+fw, fy+int(fh*0.5))], fill=(30,60,110,200), width=10)
-
-    return rgb
+def render_performative_overlays(pil_imgs: List[Image.Image]) -> List[Image.Image]:
+    """render_performative_overlay for several images, composited in parallel."""
+    with ADMISSION.admit(priority=True):
+        return overlay.compose_batch(pil_imgs, workers=BATCH_DECODE_WORKERS)
 
 
 @app.route("/performative_convert", methods=["POST"])
 def performative_convert():
-    """Heuristic image-to-image conversion to add performative accessories."""
+    """Heuristic image-to-image conversion to add performative accessories.
+
+    Send ``images`` (a list of data URLs, all within the usual body limit) instead of
+    ``image`` to convert several at once; the reply then carries ``images`` (data URLs,
+    or /outputs URLs in url mode).
+    """
     try:
         payload = request.get_json(force=True, silent=False)
+        if isinstance(payload, dict) and isinstance(payload.get("images"), list):
+            return _performative_convert_many(payload["images"], _response_mode(payload))
         data_url = payload.get("image") if isinstance(payload, dict) else None
         if not data_url:
             return jsonify({"ok": False, "error": "Missing image"}), 400
 
-        base64_part = data_url.split(",", 1)[1] if "," in data_url else data_url
-        binary = base64.b64decode(base64_part)
-        pil_img = Image.open(io.BytesIO(binary)).convert("RGBA")
+        pil_img = parse_data_url_to_pil(data_url, CONVERT_MAX_SIDE, "RGBA")
 
-        out = _draw_performative_overlay(pil_img)
+        out = render_performative_overlay(pil_img)
 
         buf = io.BytesIO()
         out.convert("RGB").save(buf, format="JPEG", quality=90)
-        b64 = base64.b64encode(buf.getvalue()).decode("ascii")
-        return jsonify({"ok": True, "image": f"data:image/jpeg;base64,{b64}"})
+        return _image_response(buf.getvalue(), "image/jpeg", _response_mode(payload))
+    except RequestEntityTooLarge as e:
+        return _too_large_response(e)
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 500
 
 
-# Load model immediately when module is imported
-load_model()
+MAX_CONVERT_BATCH = 16
+
+
+def _performative_convert_many(data_urls: List[Any], mode: str):
+    if not data_urls or len(data_urls) > MAX_CONVERT_BATCH:
+        return jsonify({"ok": False, "error": f"Send between 1 and {MAX_CONVERT_BATCH} images"}), 400
+    if mode == "binary":
+        return jsonify({"ok": False, "error": "Binary responses hold a single image; use json or url"}), 400
+    outs = render_performative_overlays([parse_data_url_to_pil(u, CONVERT_MAX_SIDE, "RGBA") for u in data_urls])
+    images = []
+    for out in outs:
+        buf = io.BytesIO()
+        out.convert("RGB").save(buf, format="JPEG", quality=90)
+        if mode == "url":
+            images.append(f"/outputs/{_save_output(buf.getvalue(), ext='jpg', prefix='overlay')}")
+        else:
+            images.append("data:image/jpeg;base64," + base64.b64encode(buf.getvalue()).decode("ascii"))
+    return jsonify({"ok": True, "images": images})
+
+
+def warm_up() -> None:
+    """Import heavy modules and load models ahead of the first request."""
+    started = time.perf_counter()
+    for module in (np, cv2, Image, ImageDraw, requests, overlay):
+        module.load()
+    overlay.prerender()
+    init_gemini()
+    try:
+        DETECTORS.model("yolov8n")
+    except ModelUnavailable as e:
+        print(f"WARNING: YOLO warm-up skipped: {e}")
+    print(f"✓ Warm-up finished in {time.perf_counter() - started:.1f}s")
+
+
+def start_warm_up() -> threading.Thread:
+    """Run warm_up in a daemon thread; requests are served meanwhile."""
+    thread = threading.Thread(target=warm_up, name="warm-up", daemon=True)
+    thread.start()
+    return thread
+
+
+# WSGI servers only import the module, so they opt in here
+if os.environ.get("PERFORMATIVE_WARMUP") == "1":
+    start_warm_up()
 
 if __name__ == "__main__":
+    # With the debug reloader only the serving child (WERKZEUG_RUN_MAIN) warms up
+    if os.environ.get("WERKZEUG_RUN_MAIN") == "true" and os.environ.get("PERFORMATIVE_WARMUP") != "1":
+        start_warm_up()
     app.run(host="0.0.0.0", port=5000, debug=True)
 
 
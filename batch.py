@@ -0,0 +1,58 @@
+"""Score a directory or .zip archive of photos offline with the /detect logic.
+
+    python batch.py path/to/photos -o results.jsonl
+    python batch.py event_dump.zip --batch-size 16 > results.jsonl
+
+Writes one JSON object per line as soon as each image is scored (the /detect body plus
+a ``file`` key), so huge archives can be followed with ``tail -f`` and a crashed run
+keeps everything written so far.
+"""
+from __future__ import annotations
+
+import argparse
+import contextlib
+import json
+import pathlib
+import sys
+import time
+import zipfile
+from typing import List, Optional
+
+# app.py reports missing optional packages on stdout; keep stdout clean JSON Lines
+with contextlib.redirect_stdout(sys.stderr):
+    import app
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Score a photo archive with the performative detector.")
+    parser.add_argument("source", type=pathlib.Path, help="directory of images or a .zip archive")
+    parser.add_argument("-o", "--output", type=pathlib.Path, help="JSON Lines output file (default: stdout)")
+    parser.add_argument("--batch-size", type=int, default=app.BATCH_SIZE, help="images per detector call")
+    parser.add_argument("--workers", type=int, default=app.BATCH_DECODE_WORKERS, help="decode threads")
+    args = parser.parse_args(argv)
+
+    scored = failed = 0
+    started = time.perf_counter()
+    with contextlib.ExitStack() as stack:
+        if args.source.is_dir():
+            items = app.iter_directory_images(args.source)
+        elif zipfile.is_zipfile(args.source):
+            items = app.iter_zip_images(stack.enter_context(zipfile.ZipFile(args.source)))
+        else:
+            parser.error(f"{args.source} is neither a directory nor a .zip archive")
+
+        out = stack.enter_context(open(args.output, "w")) if args.output else sys.stdout
+        stack.enter_context(contextlib.redirect_stdout(sys.stderr))  # model loading messages
+        for result in app.score_images(items, args.batch_size, args.workers):
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            scored += 1
+            failed += not result["ok"]
+
+    elapsed = time.perf_counter() - started
+    print(f"Scored {scored} images ({failed} failed) in {elapsed:.1f}s", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
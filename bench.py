@@ -0,0 +1,127 @@
+"""Micro-benchmarks for the Flask backend.
+
+Run with ``python bench.py``. Everything uses synthetic inputs, so no camera, model
+weights or API keys are needed. Cold-start numbers come from fresh interpreters.
+"""
+from __future__ import annotations
+
+import io
+import json
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, List, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image
+
+
+def _timeit(fn: Callable[[], object], repeat: int = 5) -> Tuple[float, object]:
+    """Return (median milliseconds, last result) over ``repeat`` calls."""
+    times: List[float] = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+
+def _nbytes(img) -> int:
+    if isinstance(img, np.ndarray):
+        return img.nbytes
+    return len(img.tobytes())
+
+
+def _synthetic_jpeg(width: int, height: int) -> bytes:
+    """A noisy gradient JPEG, roughly what a phone camera upload compresses to."""
+    rng = np.random.default_rng(0)
+    x = np.linspace(0, 255, width, dtype=np.float32)
+    y = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base = np.stack([x + 0 * y, y + 0 * x, (x + y) / 2], axis=-1)
+    noise = rng.normal(0, 12, size=base.shape)
+    rgb = np.clip(base + noise, 0, 255).astype(np.uint8)
+    buf = io.BytesIO()
+    Image.fromarray(rgb).save(buf, format="JPEG", quality=90)
+    return buf.getvalue()
+
+
+_COLD_START_SNIPPET = """
+import json, sys, time
+start = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.app.test_client().get("/")
+served = time.perf_counter()
+heavy = ("cv2", "numpy", "PIL.Image", "requests", "ultralytics", "google.generativeai")
+print(json.dumps({
+    "import_ms": (imported - start) * 1000,
+    "first_response_ms": (served - imported) * 1000,
+    "heavy_loaded": [m for m in heavy if m in sys.modules],
+}))
+"""
+
+
+def bench_cold_start(repeat: int = 3) -> None:
+    """Import app.py in fresh interpreters and time it plus the first / response."""
+    runs = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", _COLD_START_SNIPPET], capture_output=True, text=True, check=True)
+        runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    print(f"cold start ({repeat} fresh interpreters)")
+    print(f"  {'import app':<34} {statistics.median(r['import_ms'] for r in runs):8.1f} ms")
+    print(f"  {'first GET /':<34} {statistics.median(r['first_response_ms'] for r in runs):8.1f} ms")
+    print(f"  {'heavy modules loaded':<34} {', '.join(runs[-1]['heavy_loaded']) or 'none'}")
+
+
+def bench_decode() -> None:
+    import app
+
+    binary = _synthetic_jpeg(5472, 3648)  # ~20 MP
+    print(f"decode: 20 MP JPEG upload ({len(binary) / 1e6:.1f} MB)")
+
+    # Each case returns the largest bitmap it had to hold
+    def full_bgr():
+        return _nbytes(cv2.imdecode(np.frombuffer(binary, dtype=np.uint8), cv2.IMREAD_COLOR))
+
+    def full_pil_thumb():
+        img = Image.open(io.BytesIO(binary)).convert("RGBA")
+        peak = _nbytes(img)
+        img.thumbnail((app.GIF_MAX_SIDE, app.GIF_MAX_SIDE))
+        return peak
+
+    cases = [
+        ("detect   native cv2.imdecode", full_bgr),
+        (f"detect   decode_bgr({app.DETECT_MAX_SIDE})", lambda: _nbytes(app.decode_bgr(binary, app.DETECT_MAX_SIDE))),
+        ("gif      native PIL + thumbnail", full_pil_thumb),
+        (f"gif      decode_pil({app.GIF_MAX_SIDE})", lambda: _nbytes(app.decode_pil(binary, app.GIF_MAX_SIDE, "RGBA"))),
+    ]
+    for name, fn in cases:
+        ms, peak = _timeit(fn)
+        print(f"  {name:<34} {ms:8.1f} ms  {peak / 1e6:7.2f} MB peak bitmap")
+
+
+def bench_overlay(batch: int = 8) -> None:
+    """Local performative overlay (the Gemini fallback) with a warm sprite cache."""
+    import overlay
+
+    img = Image.open(io.BytesIO(_synthetic_jpeg(1280, 960))).convert("RGBA")
+    rgb = np.array(img.convert("RGB"))
+    print("overlay: 1280x960 conversion")
+    ms, _ = _timeit(lambda: overlay._overalls(256, 256).sprite(), repeat=3)
+    print(f"  {'render one sprite (cache miss)':<34} {ms:8.1f} ms")
+    overlay.prerender()
+    ms, _ = _timeit(lambda: overlay.find_face(rgb))
+    print(f"  {'find_face':<34} {ms:8.1f} ms")
+    ms, _ = _timeit(lambda: overlay.compose(img))
+    print(f"  {'compose':<34} {ms:8.1f} ms")
+    ms, _ = _timeit(lambda: overlay.compose_batch([img] * batch), repeat=3)
+    print(f"  {f'compose_batch({batch}), per image':<34} {ms / batch:8.1f} ms")
+
+
+if __name__ == "__main__":
+    bench_cold_start()
+    bench_decode()
+    bench_overlay()
@@ -0,0 +1,334 @@
+"""Registry mapping performative labels to pluggable, lazily loaded detectors.
+
+A *detector* is a function ``detect(frame, model, labels) -> [detection dicts]`` that
+can report one or more labels. Detectors that need a heavy model name it; the model is
+loaded on first use and kept in an LRU cache bounded by a memory budget, so detectors
+nobody asks for never cost startup time or resident memory.
+
+Registering a detector for a label that is already mapped replaces the old one, which
+is how a stronger model for a single label (say, a dedicated matcha classifier) gets
+plugged in.
+
+A detector may also provide ``detect_tracked(frame, model, labels, state)``; when
+``run`` is given per-session state (see SessionStates) it is called instead of
+``detect`` with a dict it can keep between frames of that session, e.g. to track
+objects and only re-check crops around them. Such a detector usually has two costs
+(a full-frame pass now and then, cheap crop passes in between), so runtimes are kept
+per mode: it records the mode that ran as ``state["mode"]`` ("full" or "tracked"),
+and its ``tracked_mode(frame, labels, state)`` says which one the next call will be, so the
+deadline check uses the matching estimate.
+
+``run`` can be given a deadline. Detectors then run best value-per-millisecond first
+(labels they can still find / their moving-average runtime), and any detector that
+would not finish in the time left is skipped; a model that is not loaded yet is loaded
+in the background instead of stalling the request.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Any, Callable, Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+if TYPE_CHECKING:
+    import numpy as np
+
+
+logger = logging.getLogger(__name__)
+
+DetectFn = Callable[["np.ndarray", Any, Set[str]], List[Dict]]
+BatchDetectFn = Callable[[List["np.ndarray"], Any, Set[str]], List[List[Dict]]]
+TrackedDetectFn = Callable[["np.ndarray", Any, Set[str], Dict[str, Any]], List[Dict]]
+TrackedModeFn = Callable[["np.ndarray", Set[str], Dict[str, Any]], str]
+
+# Runtime estimates are kept per detector and mode: plain detect() and full-frame
+# tracked passes are "full", crop-only tracked passes are "tracked"
+FULL, TRACKED = "full", "tracked"
+
+
+class ModelUnavailable(RuntimeError):
+    """A model failed to load (missing package, weights, ...)."""
+
+
+@dataclass(frozen=True)
+class ModelSpec:
+    key: str
+    loader: Callable[[], Any]
+    cost_bytes: int = 0
+
+
+@dataclass(frozen=True)
+class DetectorSpec:
+    name: str
+    labels: FrozenSet[str]
+    detect: DetectFn
+    model: Optional[str] = None
+    # Optional many-frames-at-once variant (e.g. one batched YOLO forward pass)
+    detect_batch: Optional[BatchDetectFn] = None
+    # Optional variant that keeps per-session state between frames
+    detect_tracked: Optional[TrackedDetectFn] = None
+    # Which mode the next detect_tracked call will run in (default: "tracked")
+    tracked_mode: Optional[TrackedModeFn] = None
+    # Runtime estimate until real timings come in, and the worth of each label it finds
+    cost_ms: float = 50.0
+    value: float = 1.0
+
+
+class DetectRun(NamedTuple):
+    detections: List[Dict]
+    labels: Set[str]
+    ran: List[str]
+    # Detectors left out to meet the deadline (or still loading their model)
+    skipped: List[str]
+
+
+class DetectorRegistry:
+    """Label -> detector mapping plus a budgeted cache of the models they use."""
+
+    # Runtime moving average weight, and how many frames in a row a detector may be
+    # skipped for the deadline before it runs anyway (so slow detectors still report).
+    # Skips are counted per session (in its state), so only a starved session is
+    # made to overrun; runs without a session share one count.
+    COST_ALPHA = 0.3
+    MAX_DEADLINE_SKIPS = 3
+    SKIPS_KEY = "_deadline_skips"
+
+    def __init__(self, memory_budget_bytes: int):
+        self.memory_budget_bytes = memory_budget_bytes
+        self._models: Dict[str, ModelSpec] = {}
+        self._loaded: "OrderedDict[str, Any]" = OrderedDict()
+        self._failed: Dict[str, str] = {}
+        self._by_label: Dict[str, DetectorSpec] = {}
+        self._lock = threading.RLock()
+        self._cost_ms: Dict[Tuple[str, str], float] = {}
+        self._deadline_skips: Dict[str, int] = {}
+        self._loading: Set[str] = set()
+        self._loading_lock = threading.Lock()
+
+    # -- registration -------------------------------------------------------------
+
+    def register_model(self, key: str, loader: Callable[[], Any], cost_bytes: int = 0) -> None:
+        """Declare a lazily loaded model and its estimated resident size."""
+        with self._lock:
+            self._models[key] = ModelSpec(key, loader, cost_bytes)
+            self._failed.pop(key, None)
+
+    def register(self, name: str, labels: Iterable[str], detect: DetectFn, model: Optional[str] = None,
+                 detect_batch: Optional[BatchDetectFn] = None, detect_tracked: Optional[TrackedDetectFn] = None,
+                 tracked_mode: Optional[TrackedModeFn] = None, cost_ms: float = 50.0,
+                 value: float = 1.0) -> DetectorSpec:
+        """Map each of ``labels`` to a detector, replacing any previous mapping."""
+        spec = DetectorSpec(name, frozenset(labels), detect, model, detect_batch, detect_tracked, tracked_mode,
+                            cost_ms, value)
+        with self._lock:
+            for label in spec.labels:
+                self._by_label[label] = spec
+            for mode in (FULL, TRACKED):
+                self._cost_ms.pop((name, mode), None)
+        return spec
+
+    def labels(self) -> Set[str]:
+        return set(self._by_label)
+
+    def detectors_for(self, labels: Iterable[str]) -> List[Tuple[DetectorSpec, Set[str]]]:
+        """Detectors needed to cover ``labels``, each with the subset it is asked for."""
+        wanted: Dict[str, Tuple[DetectorSpec, Set[str]]] = {}
+        for label in sorted(labels):
+            spec = self._by_label.get(label)
+            if spec is None:
+                continue
+            wanted.setdefault(spec.name, (spec, set()))[1].add(label)
+        return list(wanted.values())
+
+    def estimate_ms(self, spec: DetectorSpec, mode: str = FULL) -> float:
+        """Moving average runtime of a detector in ``mode``.
+
+        Until it has run in that mode: the full-pass average, then the registered hint.
+        """
+        full = self._cost_ms.get((spec.name, FULL), spec.cost_ms)
+        return full if mode == FULL else self._cost_ms.get((spec.name, mode), full)
+
+    def plan(self, labels: Iterable[str]) -> List[Tuple[DetectorSpec, Set[str]]]:
+        """detectors_for(), best expected value per millisecond first."""
+        return sorted(
+            self.detectors_for(labels),
+            key=lambda item: -item[0].value * len(item[1]) / max(self.estimate_ms(item[0]), 1.0),
+        )
+
+    def _observe(self, name: str, mode: str, elapsed_ms: float) -> None:
+        old = self._cost_ms.get((name, mode))
+        self._cost_ms[(name, mode)] = (
+            elapsed_ms if old is None else (1 - self.COST_ALPHA) * old + self.COST_ALPHA * elapsed_ms
+        )
+
+    def _should_skip(self, spec: DetectorSpec, deadline: float, mode: str, skips: Dict[str, int]) -> bool:
+        """Whether to leave ``spec`` (about to run in ``mode``) out of a run that must finish by ``deadline``.
+
+        ``skips`` counts the caller's consecutive deadline skips per detector.
+        """
+        if spec.model and not self.is_loaded(spec.model) and spec.model not in self._failed:
+            self.load_async(spec.model)
+            return True
+        remaining_ms = (deadline - time.perf_counter()) * 1000
+        if self.estimate_ms(spec, mode) <= remaining_ms:
+            skips[spec.name] = 0
+            return False
+        count = skips.get(spec.name, 0) + 1
+        if count > self.MAX_DEADLINE_SKIPS:
+            skips[spec.name] = 0
+            return False
+        skips[spec.name] = count
+        return True
+
+    # -- models -------------------------------------------------------------------
+
+    def is_loaded(self, key: str) -> bool:
+        return key in self._loaded
+
+    def loaded(self) -> List[str]:
+        return list(self._loaded)
+
+    def model(self, key: str) -> Any:
+        """Return a loaded model, loading it (and evicting others) if needed."""
+        with self._lock:
+            if key in self._loaded:
+                self._loaded.move_to_end(key)
+                return self._loaded[key]
+            if key in self._failed:
+                raise ModelUnavailable(self._failed[key])
+            spec = self._models.get(key)
+            if spec is None:
+                raise ModelUnavailable(f"No model registered as {key!r}")
+            try:
+                instance = spec.loader()
+            except Exception as e:
+                self._failed[key] = f"{key}: {e}"
+                raise ModelUnavailable(self._failed[key]) from e
+            self._loaded[key] = instance
+            self._evict_over_budget(keep=key)
+            return instance
+
+    def load_async(self, key: str) -> None:
+        """Start loading a model in a background thread (no-op if loaded or loading)."""
+        with self._loading_lock:
+            if key in self._loading or key in self._loaded or key in self._failed:
+                return
+            self._loading.add(key)
+
+        def load() -> None:
+            try:
+                self.model(key)
+            except ModelUnavailable as e:
+                logger.warning("Background load failed: %s", e)
+            finally:
+                with self._loading_lock:
+                    self._loading.discard(key)
+
+        threading.Thread(target=load, name=f"load-{key}", daemon=True).start()
+
+    def evict(self, key: str) -> None:
+        with self._lock:
+            if self._loaded.pop(key, None) is not None:
+                logger.info("Evicted model %s", key)
+
+    def resident_bytes(self) -> int:
+        return sum(self._models[k].cost_bytes for k in self._loaded)
+
+    def _evict_over_budget(self, keep: str) -> None:
+        for key in list(self._loaded):
+            if self.resident_bytes() <= self.memory_budget_bytes:
+                break
+            if key != keep:
+                self.evict(key)
+
+    # -- running ------------------------------------------------------------------
+
+    def run(self, frame: np.ndarray, labels: Optional[Iterable[str]] = None,
+            deadline: Optional[float] = None, state: Optional[Dict[str, Dict[str, Any]]] = None) -> DetectRun:
+        """Run only the detectors needed for ``labels`` (default: every label).
+
+        With a ``deadline`` (a ``time.perf_counter()`` value), detectors run in plan()
+        order and those that would overrun it are skipped. ``state`` is the session's
+        entry from SessionStates, for detectors with detect_tracked and the session's
+        deadline skip counts. A failing detector
+        is logged and left out so the others still report.
+        """
+        detections: List[Dict] = []
+        ran: List[str] = []
+        skipped: List[str] = []
+        skips = self._deadline_skips if state is None else state.setdefault(self.SKIPS_KEY, {})
+        for spec, wanted in self.plan(self.labels() if labels is None else labels):
+            tracked = state.setdefault(spec.name, {}) if spec.detect_tracked is not None and state is not None else None
+            mode = FULL
+            if tracked is not None:
+                mode = spec.tracked_mode(frame, wanted, tracked) if spec.tracked_mode is not None else TRACKED
+            if deadline is not None and self._should_skip(spec, deadline, mode, skips):
+                skipped.append(spec.name)
+                continue
+            try:
+                model = self.model(spec.model) if spec.model else None
+                started = time.perf_counter()
+                if tracked is not None:
+                    found = spec.detect_tracked(frame, model, wanted, tracked)
+                    mode = tracked.get("mode", mode)
+                else:
+                    found = spec.detect(frame, model, wanted)
+            except ModelUnavailable as e:
+                logger.debug("Skipping %s: %s", spec.name, e)
+                continue
+            except Exception as e:
+                logger.warning("Detector %s failed: %s", spec.name, e, exc_info=True)
+                continue
+            self._observe(spec.name, mode, (time.perf_counter() - started) * 1000)
+            ran.append(spec.name)
+            detections.extend(d for d in found if d["label"] in wanted)
+        return DetectRun(detections, {d["label"] for d in detections}, ran, skipped)
+
+    def run_batch(self, frames: List[np.ndarray], labels: Optional[Iterable[str]] = None) -> List[Tuple[List[Dict], Set[str]]]:
+        """Like run() for many frames; detectors with detect_batch see them all at once.
+
+        Returns (detections, labels found) per frame, in input order.
+        """
+        per_frame: List[List[Dict]] = [[] for _ in frames]
+        for spec, wanted in self.detectors_for(self.labels() if labels is None else labels):
+            try:
+                model = self.model(spec.model) if spec.model else None
+                if spec.detect_batch is not None:
+                    found = spec.detect_batch(frames, model, wanted)
+                else:
+                    found = [spec.detect(frame, model, wanted) for frame in frames]
+            except ModelUnavailable as e:
+                logger.debug("Skipping %s: %s", spec.name, e)
+                continue
+            except Exception as e:
+                logger.warning("Detector %s failed: %s", spec.name, e, exc_info=True)
+                continue
+            for detections, frame_found in zip(per_frame, found):
+                detections.extend(d for d in frame_found if d["label"] in wanted)
+        return [(detections, {d["label"] for d in detections}) for detections in per_frame]
+
+
+class SessionStates:
+    """Per-session scratch space (detect_tracked state, deadline skips), bounded LRU with an idle timeout.
+
+    Process-local on purpose (it holds arrays such as tracking templates); a session
+    served by another worker just starts from a full-frame pass there.
+    """
+
+    def __init__(self, max_sessions: int = 1024, ttl_seconds: float = 900):
+        self.max_sessions = max_sessions
+        self.ttl_seconds = ttl_seconds
+        self._states: "OrderedDict[str, Tuple[float, Dict[str, Dict[str, Any]]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, session_id: str) -> Dict[str, Dict[str, Any]]:
+        with self._lock:
+            touched, state = self._states.pop(session_id, (0.0, {}))
+            if time.time() - touched > self.ttl_seconds:
+                state = {}
+            self._states[session_id] = (time.time(), state)
+            while len(self._states) > self.max_sessions:
+                self._states.popitem(last=False)
+            return state
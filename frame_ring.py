@@ -0,0 +1,157 @@
+"""Shared-memory ring buffer for decoded camera frames.
+
+One decoded frame is written once into a slot of a ``multiprocessing.shared_memory``
+block. Any number of consumers (YOLO, the earphone detector, an overlay renderer, ...)
+in this or other processes then read it as a NumPy view, without copying or pickling
+the pixels. Only a tiny ``FrameRef`` travels between processes.
+
+Slots are reference counted: ``put`` hands out ``refs`` references and the slot is
+reused once every consumer has called ``release``.
+
+Typical use across processes::
+
+    ring = FrameRing(slots=4, max_shape=(1280, 1280, 3))
+    worker = Process(target=consume, args=(ring.handle(), queue))   # lock travels here
+    ref = ring.put(bgr, refs=2)            # two consumers
+    queue.put(ref)
+    ...
+    # in consume():
+    ring = FrameRing.attach(handle)
+    frame = ring.view(ref)                 # zero-copy, read-only
+    ...
+    ring.release(ref)
+"""
+from __future__ import annotations
+
+import multiprocessing
+from multiprocessing import shared_memory
+from typing import NamedTuple, Tuple
+
+import numpy as np
+
+
+# Header layout, one int64 row per slot: refcount, generation, height, width
+_HEADER_FIELDS = 4
+_ALIGN = 64
+
+
+class RingFull(RuntimeError):
+    """Every slot is still referenced by a consumer."""
+
+
+class StaleFrame(RuntimeError):
+    """The slot behind a FrameRef has since been reused for a newer frame."""
+
+
+class FrameRef(NamedTuple):
+    """Picklable pointer to a frame stored in a FrameRing."""
+    slot: int
+    generation: int
+    height: int
+    width: int
+
+
+class RingHandle(NamedTuple):
+    """Everything another process needs to attach to an existing ring."""
+    name: str
+    slots: int
+    max_shape: Tuple[int, int, int]
+    lock: object
+
+
+class FrameRing:
+    """Fixed-size ring of uint8 HxWx3 frame slots in shared memory."""
+
+    def __init__(self, slots: int = 4, max_shape: Tuple[int, int, int] = (1280, 1280, 3),
+                 *, mp_context=None, _attach: RingHandle | None = None):
+        """``mp_context`` must match the context the consumer processes are started with."""
+        self.slots = slots
+        self.max_shape = tuple(max_shape)
+        self.slot_bytes = int(np.prod(self.max_shape))
+        header_bytes = -(-slots * _HEADER_FIELDS * 8 // _ALIGN) * _ALIGN
+
+        if _attach is None:
+            self._lock = (mp_context or multiprocessing).Lock()
+            self._shm = shared_memory.SharedMemory(create=True, size=header_bytes + slots * self.slot_bytes)
+            self._owner = True
+        else:
+            self._lock = _attach.lock
+            try:
+                # Attaching processes must not unlink the block on exit (Python 3.13+)
+                self._shm = shared_memory.SharedMemory(name=_attach.name, track=False)
+            except TypeError:
+                self._shm = shared_memory.SharedMemory(name=_attach.name)
+            self._owner = False
+
+        self._header = np.ndarray((slots, _HEADER_FIELDS), dtype=np.int64, buffer=self._shm.buf)
+        self._data = np.ndarray((slots, self.slot_bytes), dtype=np.uint8, buffer=self._shm.buf, offset=header_bytes)
+        if self._owner:
+            self._header[:] = 0
+        self._next = 0
+
+    @classmethod
+    def attach(cls, handle: RingHandle) -> "FrameRing":
+        """Open a ring created by another process."""
+        return cls(handle.slots, handle.max_shape, _attach=handle)
+
+    def handle(self) -> RingHandle:
+        """Descriptor to pass to worker processes (at Process creation, because of the lock)."""
+        return RingHandle(self._shm.name, self.slots, self.max_shape, self._lock)
+
+    def put(self, frame: np.ndarray, refs: int = 1) -> FrameRef:
+        """Copy ``frame`` into a free slot and return a reference held ``refs`` times."""
+        h, w = frame.shape[:2]
+        if frame.dtype != np.uint8 or frame.shape[2:] != self.max_shape[2:]:
+            raise ValueError(f"Expected uint8 (H, W, {self.max_shape[2]}) frame, got {frame.dtype} {frame.shape}")
+        if h > self.max_shape[0] or w > self.max_shape[1]:
+            raise ValueError(f"Frame {w}x{h} exceeds ring slot size {self.max_shape[1]}x{self.max_shape[0]}")
+
+        with self._lock:
+            for i in range(self.slots):
+                slot = (self._next + i) % self.slots
+                if self._header[slot, 0] == 0:
+                    break
+            else:
+                raise RingFull(f"All {self.slots} frame slots are in use")
+            self._header[slot, 0] = refs
+            self._header[slot, 1] += 1
+            self._header[slot, 2:] = (h, w)
+            generation = int(self._header[slot, 1])
+            self._next = (slot + 1) % self.slots
+
+        # The slot is ours until released, so the copy can happen outside the lock
+        self._data[slot, : frame.nbytes].reshape(frame.shape)[...] = frame
+        return FrameRef(slot, generation, h, w)
+
+    def view(self, ref: FrameRef) -> np.ndarray:
+        """Read-only NumPy view of the frame; valid until the caller releases ``ref``."""
+        if self._header[ref.slot, 1] != ref.generation:
+            raise StaleFrame(f"Slot {ref.slot} was reused (generation {ref.generation})")
+        shape = (ref.height, ref.width) + self.max_shape[2:]
+        frame = self._data[ref.slot, : int(np.prod(shape))].reshape(shape)
+        frame.flags.writeable = False
+        return frame
+
+    def acquire(self, ref: FrameRef) -> None:
+        """Take one more reference on a live frame (e.g. to hand it to another consumer)."""
+        with self._lock:
+            if self._header[ref.slot, 1] != ref.generation or self._header[ref.slot, 0] <= 0:
+                raise StaleFrame(f"Slot {ref.slot} is no longer live")
+            self._header[ref.slot, 0] += 1
+
+    def release(self, ref: FrameRef) -> None:
+        """Drop one reference; the slot becomes reusable when the count hits zero."""
+        with self._lock:
+            if self._header[ref.slot, 1] == ref.generation and self._header[ref.slot, 0] > 0:
+                self._header[ref.slot, 0] -= 1
+
+    def in_use(self) -> int:
+        """Number of slots currently holding a referenced frame."""
+        return int(np.count_nonzero(self._header[:, 0]))
+
+    def close(self) -> None:
+        """Detach from the block; the creating process also unlinks it."""
+        del self._header, self._data
+        self._shm.close()
+        if self._owner:
+            self._shm.unlink()
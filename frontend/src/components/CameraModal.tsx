@@ -9,6 +9,11 @@ interface CameraModalProps {
   onSignIn: (imageDataUrl: string, detectedItems: Set<string>) => void;
 }
 
+// Default delay between detection frames; the server may ask for longer under load
+const DEFAULT_POLL_INTERVAL_MS = 400;
+// How long the "Just found!" badge stays on an item after the server first reports it
+const JUST_FOUND_BADGE_MS = 2000;
+
 const PERFORMATIVE_ITEMS = [
   { id: 'Matcha', label: 'Matcha', emoji: '🍵' },
   { id: 'Wired Earphones', label: 'Wired Earphones', emoji: '🎧' },
@@ -23,11 +28,15 @@ export default function CameraModal({ isOpen, onClose, onSignIn }: CameraModalPr
   const streamRef = useRef<MediaStream | null>(null);
   const [isStreaming, setIsStreaming] = useState(false);
   const [persistentItems, setPersistentItems] = useState<Set<string>>(new Set());
-  const [currentItems, setCurrentItems] = useState<Set<string>>(new Set());
+  // When each item was last newly found (the server reports an item once per session)
+  const [justFound, setJustFound] = useState<Record<string, number>>({});
   const [isProcessing, setIsProcessing] = useState(false);
   const [lastError, setLastError] = useState<string | null>(null);
   const detectionTimeoutRef = useRef<number | null>(null);
   const [isSigningIn, setIsSigningIn] = useState(false);
+  // New detection session per modal open; the server remembers what it already found
+  const sessionIdRef = useRef<string>(crypto.randomUUID());
+  const pollIntervalRef = useRef<number>(DEFAULT_POLL_INTERVAL_MS);
 
   const captureFrame = (): string | null => {
     if (!videoRef.current || !canvasRef.current) return null;
@@ -112,35 +121,43 @@ export default function CameraModal({ isOpen, onClose, onSignIn }: CameraModalPr
     
     const detect = async () => {
       if (!videoRef.current || videoRef.current.readyState < 2) {
-        detectionTimeoutRef.current = window.setTimeout(detect, 400);
+        detectionTimeoutRef.current = window.setTimeout(detect, pollIntervalRef.current);
         return;
       }
       
       if (isProcessing || isSigningIn) {
-        detectionTimeoutRef.current = window.setTimeout(detect, 400);
+        detectionTimeoutRef.current = window.setTimeout(detect, pollIntervalRef.current);
         return;
       }
       
       const frame = captureFrame();
       if (!frame) {
-        detectionTimeoutRef.current = window.setTimeout(detect, 400);
+        detectionTimeoutRef.current = window.setTimeout(detect, pollIntervalRef.current);
         return;
       }
 
       try {
         setIsProcessing(true);
-        const result = await detectItems(frame);
+        const result = await detectItems(frame, sessionIdRef.current);
+        pollIntervalRef.current = result.poll_interval_ms ?? DEFAULT_POLL_INTERVAL_MS;
         
         if (result.ok) {
           setLastError(null);
           const labels = result.labels || [];
-          const newItems = new Set(labels);
-          setCurrentItems(newItems);
+          if (labels.length > 0) {
+            const now = Date.now();
+            setJustFound(prev => {
+              const updated = { ...prev };
+              labels.forEach(label => { updated[label] = now; });
+              return updated;
+            });
+          }
           
           // PERSISTENT: Once detected, add to persistent set (never remove)
           setPersistentItems(prev => {
             const updated = new Set(prev);
             labels.forEach(label => updated.add(label));
+            (result.session_labels || []).forEach(label => updated.add(label));
             return updated;
           });
         } else {
@@ -151,7 +168,7 @@ export default function CameraModal({ isOpen, onClose, onSignIn }: CameraModalPr
         setLastError(err?.message || 'Network error');
       } finally {
         setIsProcessing(false);
-        detectionTimeoutRef.current = window.setTimeout(detect, 400);
+        detectionTimeoutRef.current = window.setTimeout(detect, pollIntervalRef.current);
       }
     };
     
@@ -184,8 +201,10 @@ export default function CameraModal({ isOpen, onClose, onSignIn }: CameraModalPr
 
   useEffect(() => {
     if (isOpen) {
+      sessionIdRef.current = crypto.randomUUID();
+      pollIntervalRef.current = DEFAULT_POLL_INTERVAL_MS;
       setPersistentItems(new Set());
-      setCurrentItems(new Set());
+      setJustFound({});
       setLastError(null);
       setIsStreaming(false);
       // Small delay to ensure video element is mounted
@@ -254,7 +273,7 @@ export default function CameraModal({ isOpen, onClose, onSignIn }: CameraModalPr
             <div className="flex-1 space-y-3 mb-6 overflow-y-auto">
               {PERFORMATIVE_ITEMS.map((item) => {
                 const isDetected = persistentItems.has(item.id);
-                const isCurrentlyVisible = currentItems.has(item.id);
+                const isJustFound = Date.now() - (justFound[item.id] ?? 0) < JUST_FOUND_BADGE_MS;
                 
                 return (
                   <div
@@ -282,10 +301,10 @@ export default function CameraModal({ isOpen, onClose, onSignIn }: CameraModalPr
                       }`}>
                         {item.label}
                       </span>
-                      {isCurrentlyVisible && isDetected && (
+                      {isJustFound && isDetected && (
                         <div className="mt-1 flex items-center gap-1">
                           <div className="w-2 h-2 rounded-full bg-[#10B981] animate-pulse"></div>
-                          <span className="text-xs text-[#10B981]">Detected</span>
+                          <span className="text-xs text-[#10B981]">Just found!</span>
                         </div>
                       )}
                     </div>
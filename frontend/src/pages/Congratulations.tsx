@@ -1,5 +1,5 @@
 import { useEffect, useState, useRef } from 'react';
-import { convertToPerformative } from '../services/api';
+import { convertToPerformative, releaseImageUrl } from '../services/api';
 import { playMusic, stopMusic } from '../utils/music';
 
 interface CongratulationsProps {
@@ -45,6 +45,9 @@ export default function Congratulations({ capturedImage, detectedItems, onGoToGa
     };
   }, []);
 
+  // Free the previous image's object URL (binary responses) when it is replaced or we unmount
+  useEffect(() => () => releaseImageUrl(performativeImage), [performativeImage]);
+
   // Convert image with Gemini
   useEffect(() => {
     const convertImage = async () => {
@@ -62,11 +65,16 @@ export default function Congratulations({ capturedImage, detectedItems, onGoToGa
         if (convertResult.ok && convertResult.image) {
           console.log('✅ Gemini conversion successful!');
           setPerformativeImage(convertResult.image);
-          // Save to localStorage for use in games (especially Pac-Man)
-          localStorage.setItem('performativeImage', convertResult.image);
-          if ((convertResult as any).saved_url) {
-            localStorage.setItem('performativeImageUrl', (convertResult as any).saved_url);
-            console.log('💾 Saved performative image URL to localStorage:', (convertResult as any).saved_url);
+          // Save to localStorage for use in games (especially Pac-Man).
+          // In 'url' mode image is just /outputs/<file>, so this stays tiny. A blob: URL
+          // ('binary' mode) would not survive a reload, so the saved URL is kept instead.
+          const storedImage = convertResult.image.startsWith('blob:') ? convertResult.saved_url : convertResult.image;
+          if (storedImage) {
+            localStorage.setItem('performativeImage', storedImage);
+          }
+          if (convertResult.saved_url) {
+            localStorage.setItem('performativeImageUrl', convertResult.saved_url);
+            console.log('💾 Saved performative image URL to localStorage:', convertResult.saved_url);
           }
           console.log('💾 Saved performative image to localStorage');
         } else {
@@ -5,35 +5,66 @@ const API_BASE = '';
 export interface DetectionResult {
   ok: boolean;
   detected: Array<{ name: string; label: string; confidence: number }>;
+  // Labels found on this frame. With a session id, labels found on earlier frames are not
+  // looked for again, so this lists only the newly found ones.
   labels: string[];
+  // Every label found so far in this session (only when a session id was sent)
+  session_labels?: string[];
   score: number;
   suggestions: string[];
   ready: boolean;
+  // Server-suggested delay before the next frame; grows while the detector is overloaded
+  poll_interval_ms?: number;
+  // True when the server shed this frame and replayed the session's last result
+  stale?: boolean;
+  // Detectors that ran on this frame, and those skipped to stay within the time budget
+  detectors?: { ran: string[]; skipped: string[] };
+  partial?: boolean;
   error?: string;
 }
 
+// How the server returns generated images (see RESPONSE_MODES in app.py):
+//   'json'   - base64 data URL inside the JSON body (legacy)
+//   'url'    - only the /outputs/<file> URL; the browser fetches and caches the bytes
+//   'binary' - raw image bytes in the response body, handed back as a blob: object URL.
+//              The caller owns it: release it with releaseImageUrl() when done, and never
+//              persist it (it dies with the page); persist saved_url instead.
+export type ImageResponseMode = 'json' | 'url' | 'binary';
+
+// Free an object URL returned in 'binary' mode; other URLs are left alone
+export function releaseImageUrl(url?: string | null): void {
+  if (url && url.startsWith('blob:')) {
+    URL.revokeObjectURL(url);
+  }
+}
+
 export interface GeminiConvertResult {
   ok: boolean;
   image?: string;
+  saved_url?: string;
   error?: string;
 }
 
 export interface GIFResult {
   ok: boolean;
   gif?: string;
+  saved_url?: string;
   error?: string;
 }
 
-export async function detectItems(imageDataUrl: string): Promise<DetectionResult> {
+// Passing a session id lets the server skip detectors for labels it already found
+// earlier in the same session.
+export async function detectItems(imageDataUrl: string, sessionId?: string): Promise<DetectionResult> {
   try {
     const res = await fetch(`${API_BASE}/detect`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ image: imageDataUrl }),
+      body: JSON.stringify({ image: imageDataUrl, session: sessionId }),
     });
     
     if (!res.ok) {
       const errorData = await res.json().catch(() => ({ error: `HTTP ${res.status}` }));
+      const retryAfter = Number(res.headers.get('Retry-After'));
       return {
         ok: false,
         detected: [],
@@ -41,6 +72,7 @@ export async function detectItems(imageDataUrl: string): Promise<DetectionResult
         score: 0,
         suggestions: [],
         ready: false,
+        poll_interval_ms: errorData.poll_interval_ms ?? (retryAfter > 0 ? retryAfter * 1000 : undefined),
         error: errorData.error || `HTTP ${res.status}`,
       };
     }
@@ -61,16 +93,41 @@ export async function detectItems(imageDataUrl: string): Promise<DetectionResult
   }
 }
 
+export interface ClipDetectionResult extends DetectionResult {
+  // Each detection also carries `t`, the clip time (seconds) of its best frame
+  detected: Array<{ name: string; label: string; confidence: number; t: number }>;
+  clip?: { fps: number; frames_read: number; sampled: number; duplicates: number; duration_s: number };
+}
+
+// Score a short recorded clip; the result has the same score/labels shape as detectItems
+export async function detectClip(video: Blob, sessionId?: string): Promise<ClipDetectionResult> {
+  const form = new FormData();
+  form.append('video', video, video instanceof File ? video.name : 'clip.webm');
+  if (sessionId) form.append('session', sessionId);
+  try {
+    const res = await fetch(`${API_BASE}/detect_clip`, { method: 'POST', body: form });
+    const data = await res.json().catch(() => ({ error: `HTTP ${res.status}` }));
+    if (!res.ok) {
+      return { ok: false, detected: [], labels: [], score: 0, suggestions: [], ready: false, error: data.error || `HTTP ${res.status}` };
+    }
+    return data;
+  } catch (err: any) {
+    console.error('Fetch error:', err);
+    return { ok: false, detected: [], labels: [], score: 0, suggestions: [], ready: false, error: err?.message || 'Network error' };
+  }
+}
+
 export async function convertToPerformative(
   imageDataUrl: string,
-  taskHint?: string
+  taskHint?: string,
+  responseMode: ImageResponseMode = 'url'
 ): Promise<GeminiConvertResult> {
   try {
     console.log('Sending request to /gemini_convert...');
     const res = await fetch(`${API_BASE}/gemini_convert`, {
       method: 'POST',
       headers: { 'Content-Type': 'application/json' },
-      body: JSON.stringify({ image: imageDataUrl, task_hint: taskHint }),
+      body: JSON.stringify({ image: imageDataUrl, task_hint: taskHint, response: responseMode }),
     });
     
     if (!res.ok) {
@@ -82,6 +139,14 @@ export async function convertToPerformative(
       };
     }
     
+    if (responseMode === 'binary') {
+      // Raw bytes: hand the page an object URL instead of a base64 string
+      const blob = await res.blob();
+      const savedUrl = res.headers.get('X-Saved-Url') || undefined;
+      console.log('Gemini response received: Success');
+      return { ok: true, image: URL.createObjectURL(blob), saved_url: savedUrl };
+    }
+
     const data = await res.json();
     console.log('Gemini response received:', data.ok ? 'Success' : `Error: ${data.error}`);
     return data;
@@ -94,12 +159,18 @@ export async function convertToPerformative(
   }
 }
 
-export async function generateGIF(imageDataUrl: string): Promise<GIFResult> {
+export async function generateGIF(
+  imageDataUrl: string,
+  responseMode: ImageResponseMode = 'url'
+): Promise<GIFResult> {
   const res = await fetch(`${API_BASE}/generate_gif`, {
     method: 'POST',
     headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify({ image: imageDataUrl }),
+    body: JSON.stringify({ image: imageDataUrl, response: responseMode }),
   });
+  if (responseMode === 'binary' && res.ok) {
+    return { ok: true, gif: URL.createObjectURL(await res.blob()) };
+  }
   return res.json();
 }
 
@@ -1,9 +1,47 @@
-import { defineConfig } from 'vite';
+import { defineConfig, type Plugin } from 'vite';
 import react from '@vitejs/plugin-react';
+import { readdirSync, readFileSync, statSync, writeFileSync } from 'node:fs';
+import { join } from 'node:path';
+import { brotliCompressSync, constants as zlibConstants, gzipSync } from 'node:zlib';
+
+const COMPRESSIBLE = /\.(js|mjs|css|html|svg|json|txt)$/;
+const MIN_COMPRESS_BYTES = 1024;
+
+// Writes .br and .gz siblings for text assets after the build so Flask can serve
+// them as-is (see _send_frontend_file in app.py) instead of compressing per request.
+function precompress(): Plugin {
+  let outDir = 'dist';
+  const walk = (dir: string): string[] =>
+    readdirSync(dir).flatMap((name) => {
+      const full = join(dir, name);
+      return statSync(full).isDirectory() ? walk(full) : [full];
+    });
+
+  return {
+    name: 'precompress',
+    apply: 'build',
+    configResolved(config) {
+      outDir = config.build.outDir;
+    },
+    closeBundle() {
+      for (const file of walk(outDir)) {
+        if (!COMPRESSIBLE.test(file)) continue;
+        const raw = readFileSync(file);
+        if (raw.length < MIN_COMPRESS_BYTES) continue;
+        const br = brotliCompressSync(raw, {
+          params: { [zlibConstants.BROTLI_PARAM_QUALITY]: zlibConstants.BROTLI_MAX_QUALITY },
+        });
+        const gz = gzipSync(raw, { level: 9 });
+        if (br.length < raw.length) writeFileSync(`${file}.br`, br);
+        if (gz.length < raw.length) writeFileSync(`${file}.gz`, gz);
+      }
+    },
+  };
+}
 
 // https://vitejs.dev/config/
 export default defineConfig({
-  plugins: [react()],
+  plugins: [react(), precompress()],
   optimizeDeps: {
     exclude: ['lucide-react'],
   },
@@ -15,6 +53,7 @@ export default defineConfig({
       '/gemini_convert': 'http://127.0.0.1:5000',
       '/generate_gif': 'http://127.0.0.1:5000',
       '/performative_convert': 'http://127.0.0.1:5000',
+      '/outputs': 'http://127.0.0.1:5000',
       '/play': 'http://127.0.0.1:5000',
       '/static': 'http://127.0.0.1:5000',
     },
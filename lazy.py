@@ -0,0 +1,49 @@
+"""Deferred imports for heavy optional modules.
+
+``cv2 = LazyModule("cv2")`` binds a proxy that performs the real import the first time
+an attribute is used, so importing the app (worker boot, tests, the static routes)
+does not pay for OpenCV, NumPy, Pillow and friends until a request actually needs them.
+"""
+from __future__ import annotations
+
+import importlib
+import importlib.util
+from types import ModuleType
+from typing import Any
+
+
+class LazyModule:
+    """Proxy for a module that is imported on first attribute access."""
+
+    def __init__(self, name: str):
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def load(self) -> ModuleType:
+        module = self.__dict__["_module"]
+        if module is None:
+            module = importlib.import_module(self.__dict__["_name"])
+            self.__dict__["_module"] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self.load(), attr)
+
+    def __setattr__(self, attr: str, value: Any) -> None:
+        setattr(self.load(), attr, value)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<LazyModule {self.__dict__['_name']!r} ({state})>"
+
+
+def module_available(name: str) -> bool:
+    """Whether ``name`` can be imported, without importing it."""
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
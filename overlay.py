@@ -0,0 +1,265 @@
+"""Sprite compositing for the local performative overlay.
+
+The overlay used to be redrawn with ``ImageDraw`` primitives on every conversion, at
+full image resolution. Here each accessory is rendered once per face-size bucket as a
+supersampled, anti-aliased RGBA sprite (premultiplied, float32) and cached by
+(sprite, scale); a conversion is then a face search on a small grey copy plus a few
+vectorized alpha blends over the sprites' bounding boxes.
+
+Sprites are laid out in face coordinates: the face box is ``(0, 0, w, h)`` and each
+sprite knows its offset from the face's top-left corner. The matcha cup is the
+exception; it is clamped to the image borders, so it is placed separately. So are the
+earphone wires and the tote strap, whose lengths (and the wires' lean towards the
+middle of the picture) depend on the image rather than the face: they are line sprites
+cached by their integer end-point offset.
+"""
+from __future__ import annotations
+
+import functools
+import math
+import os
+import queue
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import cv2
+import numpy as np
+from PIL import Image, ImageDraw
+
+
+# Face sizes are snapped to buckets 2**(1/8) apart (< 5% size error), from 32 px up
+SCALE_BASE = 32
+SCALE_STEPS_PER_OCTAVE = 8
+# Sprites are drawn this many times larger, then box-filtered down (anti-aliasing);
+# big sprites need less of it and would otherwise cost a lot of memory to render
+MAX_SUPERSAMPLE = 4
+# Faces are searched for on a copy whose longer side is at most this
+FACE_SEARCH_SIDE = 480
+FACE_MIN_SIZE = 60
+# Smallest face the Haar cascade can find (its window size); the search copy is never
+# shrunk so far that a FACE_MIN_SIZE face in the original falls below it
+CASCADE_WINDOW = 24
+
+WIRE_FILL, WIRE_WIDTH = (240, 240, 240, 220), 2
+STRAP_FILL, STRAP_WIDTH = (245, 245, 245, 220), 6
+
+Box = Tuple[int, int, int, int]
+
+
+class Sprite(NamedTuple):
+    """Premultiplied RGB (0-255), 1 - alpha, and the top-left offset from the anchor."""
+    rgb: np.ndarray
+    inv_alpha: np.ndarray
+    dx: int
+    dy: int
+
+
+class _Canvas:
+    """Supersampled RGBA canvas addressed in unscaled coordinates relative to the anchor.
+
+    Every primitive is drawn on its own layer and composited "over" the previous ones,
+    matching how ImageDraw blends translucent fills onto the photo.
+    """
+
+    def __init__(self, x0: float, y0: float, x1: float, y1: float):
+        self.dx, self.dy = math.floor(x0) - 2, math.floor(y0) - 2
+        self.size = (math.ceil(x1) + 2 - self.dx, math.ceil(y1) + 2 - self.dy)
+        self.ss = max(2, min(MAX_SUPERSAMPLE, 1024 // max(self.size)))
+        self.image = Image.new("RGBA", (self.size[0] * self.ss, self.size[1] * self.ss), (0, 0, 0, 0))
+
+    def _xy(self, points: Sequence[Tuple[float, float]]) -> List[Tuple[float, float]]:
+        return [((x - self.dx) * self.ss, (y - self.dy) * self.ss) for x, y in points]
+
+    def draw(self, shape: str, points: Sequence[Tuple[float, float]], **kwargs) -> None:
+        for key in ("width", "radius"):
+            if key in kwargs:
+                kwargs[key] = round(kwargs[key] * self.ss)
+        layer = Image.new("RGBA", self.image.size, (0, 0, 0, 0))
+        getattr(ImageDraw.Draw(layer), shape)(self._xy(points), **kwargs)
+        self.image = Image.alpha_composite(self.image, layer)
+
+    def sprite(self) -> Sprite:
+        small = np.asarray(self.image.resize(self.size, Image.BOX), dtype=np.float32)
+        alpha = small[..., 3:] / 255.0
+        return Sprite(small[..., :3] * alpha, 1.0 - alpha, self.dx, self.dy)
+
+
+def _glasses(fw: int, fh: int) -> _Canvas:
+    gy, gh, pad = fh * 0.35, max(6, int(fh * 0.08)), int(fw * 0.05)
+    c = _Canvas(-pad, gy, fw + pad, gy + gh)
+    c.draw("rounded_rectangle", [(-pad, gy), (fw + pad, gy + gh)], radius=gh / 2, fill=(255, 255, 255, 140))
+    c.draw("rectangle", [(fw / 2 - 6, gy), (fw / 2 + 6, gy + gh)], fill=(220, 220, 220, 180))
+    return c
+
+
+def _ear_buds(fw: int, fh: int) -> Tuple[int, List[Tuple[int, int]]]:
+    """Bud radius and bud centres (face coordinates)."""
+    r = max(3, int(fh * 0.06))
+    ey = int(fh * 0.45)
+    return r, [(-int(r * 1.2), ey), (fw + int(r * 1.2), ey)]
+
+
+def _earphones(fw: int, fh: int) -> _Canvas:
+    """The buds; their wires are line sprites (see compose)."""
+    r, buds = _ear_buds(fw, fh)
+    c = _Canvas(buds[0][0] - r, buds[0][1] - r, buds[1][0] + r, buds[1][1] + r)
+    for ex, ey in buds:
+        c.draw("ellipse", [(ex - r, ey - r), (ex + r, ey + r)], fill=(255, 255, 255, 230))
+    return c
+
+
+def _strap_top(fw: int, fh: int) -> Tuple[int, int]:
+    """Where the tote strap leaves the shoulder (face coordinates)."""
+    return int(fw * 0.15), fh + int(fh * 0.2) - 10
+
+
+def _overalls(fw: int, fh: int) -> _Canvas:
+    bib_w, bib_h = int(fw * 0.9), int(fh * 0.6)
+    bx, by = fw // 2 - bib_w // 2, fh + int(fh * 0.05)
+    c = _Canvas(-5, fh * 0.5 - 5, fw + 5, by + bib_h)
+    c.draw("rounded_rectangle", [(bx, by), (bx + bib_w, by + bib_h)], radius=12, fill=(30, 60, 110, 180))
+    c.draw("line", [(bx + 10, by), (0, fh * 0.5)], fill=(30, 60, 110, 200), width=10)
+    c.draw("line", [(bx + bib_w - 10, by), (fw, fh * 0.5)], fill=(30, 60, 110, 200), width=10)
+    return c
+
+
+def _cup_size(fw: int) -> Tuple[int, int]:
+    w = max(30, int(fw * 0.28))
+    return w, int(w * 1.3)
+
+
+def _matcha(fw: int, fh: int) -> _Canvas:
+    """Anchored at the cup's top-left corner rather than the face."""
+    w, h = _cup_size(fw)
+    c = _Canvas(-4, -24, w + 4, h)
+    c.draw("rounded_rectangle", [(0, 0), (w, h)], radius=10, fill=(122, 201, 138, 220), outline=(200, 255, 210, 240))
+    c.draw("rectangle", [(-4, -8), (w + 4, 0)], fill=(235, 235, 235, 230))
+    c.draw("rectangle", [(w // 2 - 3, -24), (w // 2 + 3, 0)], fill=(40, 120, 40, 230))
+    return c
+
+
+# Composited in this order, with the wires after the buds and the strap before the cup
+SPRITES: Dict[str, Callable[[int, int], _Canvas]] = {
+    "glasses": _glasses,
+    "earphones": _earphones,
+    "matcha": _matcha,
+    "overalls": _overalls,
+}
+
+
+def scale_bucket(size: float) -> int:
+    """Snap a face side in pixels to the nearest cached sprite scale."""
+    step = round(SCALE_STEPS_PER_OCTAVE * math.log2(max(size, SCALE_BASE) / SCALE_BASE))
+    return round(SCALE_BASE * 2 ** (step / SCALE_STEPS_PER_OCTAVE))
+
+
+@functools.lru_cache(maxsize=64)
+def sprite(name: str, scale: Tuple[int, int]) -> Sprite:
+    """The named accessory rendered for a face box of ``scale`` = (width, height) (cached)."""
+    return SPRITES[name](*scale).sprite()
+
+
+@functools.lru_cache(maxsize=128)
+def line(dx: int, dy: int, width: int, fill: Tuple[int, int, int, int]) -> Sprite:
+    """A straight line from the anchor to ``(dx, dy)`` (cached)."""
+    c = _Canvas(min(0, dx) - width, min(0, dy) - width, max(0, dx) + width, max(0, dy) + width)
+    c.draw("line", [(0, 0), (dx, dy)], fill=fill, width=width)
+    return c.sprite()
+
+
+def prerender(face_sizes: Iterable[float] = (64, 128, 256, 512)) -> None:
+    """Render every sprite for the (square) face buckets around ``face_sizes`` ahead of time."""
+    for size in face_sizes:
+        bucket = scale_bucket(size)
+        for name in SPRITES:
+            sprite(name, (bucket, bucket))
+
+
+def blend(dst: np.ndarray, spr: Sprite, x: int, y: int) -> None:
+    """Alpha-blend ``spr`` onto the uint8 RGB array ``dst`` in place, clipped to its bounds."""
+    x0, y0 = x + spr.dx, y + spr.dy
+    h, w = spr.inv_alpha.shape[:2]
+    cx0, cy0 = max(x0, 0), max(y0, 0)
+    cx1, cy1 = min(x0 + w, dst.shape[1]), min(y0 + h, dst.shape[0])
+    if cx0 >= cx1 or cy0 >= cy1:
+        return
+    sy, sx = slice(cy0 - y0, cy1 - y0), slice(cx0 - x0, cx1 - x0)
+    roi = dst[cy0:cy1, cx0:cx1]
+    out = roi * spr.inv_alpha[sy, sx] + spr.rgb[sy, sx]
+    np.add(out, 0.5, out=out)
+    roi[...] = out.astype(np.uint8)
+
+
+# A classifier must not be used by two threads at once; idle ones are pooled for reuse
+_cascades: "queue.SimpleQueue[cv2.CascadeClassifier]" = queue.SimpleQueue()
+
+
+def _detect_faces(grey: np.ndarray, min_side: int) -> Sequence[Box]:
+    try:
+        cascade = _cascades.get_nowait()
+    except queue.Empty:
+        cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    try:
+        return cascade.detectMultiScale(grey, scaleFactor=1.1, minNeighbors=5, minSize=(min_side, min_side))
+    finally:
+        _cascades.put(cascade)
+
+
+def find_face(rgb: np.ndarray) -> Optional[Box]:
+    """Largest frontal face as (x, y, w, h), searched on a downscaled grey copy."""
+    h, w = rgb.shape[:2]
+    factor = min(1.0, max(FACE_SEARCH_SIDE / max(h, w), CASCADE_WINDOW / FACE_MIN_SIZE))
+    grey = cv2.cvtColor(rgb, cv2.COLOR_RGB2GRAY)
+    if factor < 1.0:
+        grey = cv2.resize(grey, (round(w * factor), round(h * factor)), interpolation=cv2.INTER_AREA)
+    min_side = max(CASCADE_WINDOW, round(FACE_MIN_SIZE * factor))
+    faces = _detect_faces(grey, min_side)
+    if len(faces) == 0:
+        return None
+    fx, fy, fw, fh = max(faces, key=lambda r: r[2] * r[3])
+    return round(fx / factor), round(fy / factor), round(fw / factor), round(fh / factor)
+
+
+def compose(pil_img: Image.Image) -> Image.Image:
+    """Overlay glasses, wired earphones, tote strap, matcha and overalls around the face.
+
+    Without a face, a box in the upper middle of the picture stands in for it.
+    """
+    rgb = np.array(pil_img.convert("RGB"))
+    H, W = rgb.shape[:2]
+    face = find_face(rgb)
+    if face is None:
+        face = int(W * 0.35), int(H * 0.25), int(W * 0.3), int(H * 0.3)
+    fx, fy, fw, fh = face
+    scale = (scale_bucket(fw), scale_bucket(fh))
+    # Centre the bucket-sized box on the face
+    ox, oy = fx + (fw - scale[0]) // 2, fy + (fh - scale[1]) // 2
+
+    for name in SPRITES:
+        spr = sprite(name, scale)
+        if name == "matcha":
+            # The strap runs from the shoulder to 18% of the picture's height below it
+            sx, sy = _strap_top(*scale)
+            strap = line(int(scale[0] * 0.45) - sx, 10 + int(H * 0.18), STRAP_WIDTH, STRAP_FILL)
+            blend(rgb, strap, ox + sx, oy + sy)
+            cup_w, cup_h = _cup_size(scale[0])
+            x = min(W - cup_w - 10, ox + scale[0] + int(scale[0] * 0.1))
+            y = min(H - cup_h - 10, oy + scale[1] + int(scale[1] * 0.2))
+            blend(rgb, spr, x, y)
+        else:
+            blend(rgb, spr, ox, oy)
+        if name == "earphones":
+            # Wires hang 15% of the picture's height, leaning towards its middle
+            r, buds = _ear_buds(*scale)
+            for ex, ey in buds:
+                x, y = ox + ex, oy + ey + r
+                blend(rgb, line(int((W / 2 - x) * 0.1), int(H * 0.15), WIRE_WIDTH, WIRE_FILL), x, y)
+    return Image.fromarray(rgb)
+
+
+def compose_batch(images: Sequence[Image.Image], workers: int = min(4, os.cpu_count() or 1)) -> List[Image.Image]:
+    """compose() over many images; face search and blending release the GIL, so threads help."""
+    if len(images) <= 1 or workers <= 1:
+        return [compose(img) for img in images]
+    with ThreadPoolExecutor(max_workers=min(workers, len(images)), thread_name_prefix="overlay") as pool:
+        return list(pool.map(compose, images))
@@ -0,0 +1,298 @@
+"""Session state and generated outputs behind one small storage interface.
+
+app.py keeps two kinds of state that must be visible to every worker serving the same
+users: per-session detection state (best confidence per label, last /detect result)
+and generated images (``/outputs/<file>``, ``/outputs/latest``). A ``Store`` holds both.
+
+Backends are chosen by URL (``PERFORMATIVE_STORE``):
+
+    memory://                      in-process LRU sessions, outputs in the local output dir
+    sqlite:///var/lib/perf/app.db  sessions and outputs in one SQLite file, shared by the
+                                   worker processes of one host (WAL mode needs shared
+                                   memory, so not across hosts or network filesystems)
+
+Several hosts need a networked backend (Redis, a database, object storage, ...); it
+only has to implement ``Store`` and be registered with ``register_backend("redis", factory)``.
+"""
+from __future__ import annotations
+
+import json
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from werkzeug.security import safe_join
+
+
+class Store(ABC):
+    """Sessions (scores + last result) and generated outputs."""
+
+    name = "store"
+
+    # -- sessions -----------------------------------------------------------------
+
+    @abstractmethod
+    def merge_scores(self, session_id: str, scores: Dict[str, float]) -> Dict[str, float]:
+        """Keep the max confidence per label for the session; return the merged scores."""
+
+    def session_scores(self, session_id: str) -> Dict[str, float]:
+        return self.merge_scores(session_id, {})
+
+    @abstractmethod
+    def set_result(self, session_id: str, result: Dict[str, Any]) -> None:
+        """Remember the session's latest /detect result."""
+
+    @abstractmethod
+    def get_result(self, session_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    # -- outputs ------------------------------------------------------------------
+
+    @abstractmethod
+    def put_output(self, name: str, data: bytes) -> None:
+        """Store a generated file under ``name`` (names are unique and never rewritten)."""
+
+    @abstractmethod
+    def get_output(self, name: str) -> Optional[bytes]:
+        ...
+
+    @abstractmethod
+    def latest_output(self, prefix: str) -> Optional[str]:
+        """Name of the newest output whose name starts with ``prefix``."""
+
+    def local_path(self, name: str) -> Optional[pathlib.Path]:
+        """Path of the output on local disk, when the backend keeps one (lets it be streamed)."""
+        return None
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryStore(Store):
+    """Single-process store: bounded LRU of sessions with an idle timeout, outputs on disk."""
+
+    name = "memory"
+
+    def __init__(self, output_dir: pathlib.Path, ttl_seconds: float = 900, max_sessions: int = 1024):
+        self.output_dir = pathlib.Path(output_dir)
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        self.ttl_seconds = ttl_seconds
+        self.max_sessions = max_sessions
+        self._sessions: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _entry(self, session_id: str) -> Dict[str, Any]:
+        """Live session data (caller holds the lock); expired sessions start over."""
+        touched, data = self._sessions.pop(session_id, (0.0, {}))
+        if time.time() - touched > self.ttl_seconds:
+            data = {}
+        data.setdefault("scores", {})
+        self._sessions[session_id] = (time.time(), data)
+        while len(self._sessions) > self.max_sessions:
+            self._sessions.popitem(last=False)
+        return data
+
+    def merge_scores(self, session_id: str, scores: Dict[str, float]) -> Dict[str, float]:
+        with self._lock:
+            best = self._entry(session_id)["scores"]
+            for label, conf in scores.items():
+                best[label] = max(best.get(label, 0.0), conf)
+            return dict(best)
+
+    def set_result(self, session_id: str, result: Dict[str, Any]) -> None:
+        with self._lock:
+            self._entry(session_id)["last"] = result
+
+    def get_result(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._entry(session_id).get("last")
+
+    def put_output(self, name: str, data: bytes) -> None:
+        joined = safe_join(self.output_dir.as_posix(), name)
+        if joined is None:
+            raise ValueError(f"Invalid output name {name!r}")
+        path = pathlib.Path(joined)
+        tmp = path.with_name(f".{path.name}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)  # readers never see a half-written file
+
+    def get_output(self, name: str) -> Optional[bytes]:
+        path = self.local_path(name)
+        return path.read_bytes() if path is not None else None
+
+    def latest_output(self, prefix: str) -> Optional[str]:
+        files = [p for p in self.output_dir.glob(f"{prefix}*") if p.is_file() and not p.name.startswith(".")]
+        return max(files, key=lambda p: p.stat().st_mtime).name if files else None
+
+    def local_path(self, name: str) -> Optional[pathlib.Path]:
+        joined = safe_join(self.output_dir.as_posix(), name)
+        if joined is None or not os.path.isfile(joined):
+            return None
+        return pathlib.Path(joined)
+
+
+class SQLiteStore(Store):
+    """Sessions and outputs in one SQLite database, shared by the processes of one host."""
+
+    name = "sqlite"
+
+    _SCHEMA = """
+        CREATE TABLE IF NOT EXISTS sessions (
+            id TEXT PRIMARY KEY,
+            scores TEXT NOT NULL,
+            result TEXT,
+            touched REAL NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS sessions_touched ON sessions (touched);
+        CREATE TABLE IF NOT EXISTS outputs (
+            name TEXT PRIMARY KEY,
+            created REAL NOT NULL,
+            data BLOB NOT NULL
+        );
+        CREATE INDEX IF NOT EXISTS outputs_created ON outputs (created);
+    """
+    # Expired sessions are swept every this many session writes
+    PURGE_EVERY = 256
+
+    def __init__(self, path: str, ttl_seconds: float = 900):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._writes = 0
+        # Idle connections, reused by whichever thread needs one next; every connection
+        # ever opened is in _opened so close() can reach them all
+        self._idle: "queue.SimpleQueue[sqlite3.Connection]" = queue.SimpleQueue()
+        self._opened: List[sqlite3.Connection] = []
+        self._opened_lock = threading.Lock()
+        if path != ":memory:":
+            pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with self._conn() as conn:
+            conn.executescript(self._SCHEMA)
+
+    @contextmanager
+    def _conn(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection (one per concurrent caller); WAL lets readers run alongside a writer."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            with self._opened_lock:
+                self._opened.append(conn)
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def _live_session(self, conn: sqlite3.Connection, session_id: str) -> Tuple[Dict[str, float], Any]:
+        row = conn.execute("SELECT scores, result, touched FROM sessions WHERE id = ?", (session_id,)).fetchone()
+        if row is None or time.time() - row[2] > self.ttl_seconds:
+            return {}, None
+        return json.loads(row[0]), row[1]
+
+    def _write_session(self, session_id: str, update: Callable[[Dict[str, float], Any], Tuple[Dict[str, float], Any]]):
+        with self._conn() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                scores, result = update(*self._live_session(conn, session_id))
+                conn.execute(
+                    "INSERT OR REPLACE INTO sessions (id, scores, result, touched) VALUES (?, ?, ?, ?)",
+                    (session_id, json.dumps(scores), result, time.time()),
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            self._writes += 1
+            if self._writes % self.PURGE_EVERY == 0:
+                conn.execute("DELETE FROM sessions WHERE touched < ?", (time.time() - self.ttl_seconds,))
+        return scores
+
+    def merge_scores(self, session_id: str, scores: Dict[str, float]) -> Dict[str, float]:
+        if not scores:
+            with self._conn() as conn:
+                return self._live_session(conn, session_id)[0]
+
+        def merge(best, result):
+            for label, conf in scores.items():
+                best[label] = max(best.get(label, 0.0), conf)
+            return best, result
+
+        return dict(self._write_session(session_id, merge))
+
+    def set_result(self, session_id: str, result: Dict[str, Any]) -> None:
+        self._write_session(session_id, lambda scores, _old: (scores, json.dumps(result)))
+
+    def get_result(self, session_id: str) -> Optional[Dict[str, Any]]:
+        with self._conn() as conn:
+            result = self._live_session(conn, session_id)[1]
+        return json.loads(result) if result else None
+
+    def put_output(self, name: str, data: bytes) -> None:
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO outputs (name, created, data) VALUES (?, ?, ?)", (name, time.time(), data)
+            )
+
+    def get_output(self, name: str) -> Optional[bytes]:
+        with self._conn() as conn:
+            row = conn.execute("SELECT data FROM outputs WHERE name = ?", (name,)).fetchone()
+        return bytes(row[0]) if row else None
+
+    def latest_output(self, prefix: str) -> Optional[str]:
+        pattern = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+        with self._conn() as conn:
+            row = conn.execute(
+                "SELECT name FROM outputs WHERE name LIKE ? ESCAPE '\\' ORDER BY created DESC LIMIT 1", (pattern,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def close(self) -> None:
+        """Close every connection this store opened, from whichever thread."""
+        with self._opened_lock:
+            opened, self._opened = self._opened, []
+        for conn in opened:
+            conn.close()
+        self._idle = queue.SimpleQueue()
+
+
+StoreFactory = Callable[..., Store]
+
+
+def _memory_factory(url: str, *, output_dir: pathlib.Path, ttl_seconds: float, max_sessions: int) -> Store:
+    return MemoryStore(output_dir, ttl_seconds, max_sessions)
+
+
+def _sqlite_factory(url: str, *, output_dir: pathlib.Path, ttl_seconds: float, max_sessions: int) -> Store:
+    # sqlite:///abs/path.db or sqlite://relative/path.db
+    parts = urlsplit(url)
+    path = (parts.netloc + parts.path) or (output_dir / "store.db").as_posix()
+    return SQLiteStore(path, ttl_seconds)
+
+
+BACKENDS: Dict[str, StoreFactory] = {"memory": _memory_factory, "sqlite": _sqlite_factory}
+
+
+def register_backend(scheme: str, factory: StoreFactory) -> None:
+    """Make ``scheme://...`` URLs open a custom store.
+
+    ``factory(url, output_dir=..., ttl_seconds=..., max_sessions=...)`` returns a Store.
+    """
+    BACKENDS[scheme] = factory
+
+
+def open_store(url: str, *, output_dir: pathlib.Path, ttl_seconds: float = 900, max_sessions: int = 1024) -> Store:
+    """Open the store named by ``url`` (see the module docstring)."""
+    scheme = urlsplit(url).scheme or url
+    factory = BACKENDS.get(scheme)
+    if factory is None:
+        raise ValueError(f"Unknown store backend {scheme!r} (known: {', '.join(sorted(BACKENDS))})")
+    return factory(url, output_dir=output_dir, ttl_seconds=ttl_seconds, max_sessions=max_sessions)
@@ -0,0 +1,107 @@
+"""/detect_clip sampling: a small object entering a still scene must be detected."""
+import cv2
+import numpy as np
+import pytest
+
+import app
+from detectors import DetectorRegistry
+
+
+FPS = 30
+SIZE = (1280, 720)
+CUP = (900, 400, 90, 120)  # x, y, w, h
+CUP_FROM_S = 2.0
+
+
+def _green_cup(frame, model, wanted):
+    """Stand-in for YOLO: reports Matcha when there is a patch of cup green."""
+    hsv = cv2.cvtColor(frame, cv2.COLOR_BGR2HSV)
+    mask = cv2.inRange(hsv, (45, 120, 80), (75, 255, 255))
+    if cv2.countNonZero(mask) < 500:
+        return []
+    x, y, w, h = cv2.boundingRect(mask)
+    return [{"name": "cup", "label": "Matcha", "confidence": 0.9, "box": [x, y, x + w, y + h]}]
+
+
+@pytest.fixture
+def cup_clip(tmp_path):
+    """8 s 1280x720 still scene; a 90x120 green cup appears at 2 s and stays."""
+    rng = np.random.default_rng(0)
+    scene = cv2.GaussianBlur(rng.integers(60, 200, (SIZE[1], SIZE[0], 3), dtype=np.uint8), (31, 31), 0)
+    path = tmp_path / "cup.avi"
+    writer = cv2.VideoWriter(str(path), cv2.VideoWriter_fourcc(*"MJPG"), FPS, SIZE)
+    assert writer.isOpened()
+    x, y, w, h = CUP
+    for i in range(8 * FPS):
+        frame = scene.copy()
+        if i >= CUP_FROM_S * FPS:
+            frame[y:y + h, x:x + w] = (60, 170, 60)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def detectors(monkeypatch):
+    registry = DetectorRegistry(memory_budget_bytes=0)
+    registry.register("cup", ["Matcha"], _green_cup)
+    monkeypatch.setattr(app, "DETECTORS", registry)
+    return registry
+
+
+def test_small_object_entering_still_scene_is_found(cup_clip, detectors):
+    result = app.score_clip(str(cup_clip))
+
+    assert result["labels"] == ["Matcha"]
+    assert CUP_FROM_S <= result["detected"][0]["t"] < CUP_FROM_S + 1.0
+    clip = result["clip"]
+    # The still stretches are still skipped, but never for more than a second
+    assert clip["duplicates"] > 0
+    assert clip["sampled"] >= 8
+
+
+def test_still_clip_is_sampled_at_least_once_per_second(cup_clip, detectors):
+    capture = cv2.VideoCapture(str(cup_clip))
+    stats = {}
+    times = [t for t, _ in app.sample_clip_frames(capture, stats)]
+    capture.release()
+
+    assert times[0] == 0.0
+    assert max(np.diff(times + [stats["duration_s"]])) <= 1.0 / app.CLIP_MIN_SAMPLE_FPS + 1e-6
+
+
+class _VariableRateCapture:
+    """cv2.VideoCapture stand-in for a browser .webm: bogus FPS, uneven timestamps."""
+
+    def __init__(self, frames, times_ms):
+        self.frames, self.times_ms, self.index = frames, times_ms, -1
+
+    def get(self, prop):
+        if prop == cv2.CAP_PROP_FPS:
+            return 1000.0
+        if prop == cv2.CAP_PROP_FRAME_COUNT:
+            return -1.0
+        if prop == cv2.CAP_PROP_POS_MSEC:
+            return self.times_ms[self.index]
+        return 0.0
+
+    def grab(self):
+        self.index += 1
+        return self.index < len(self.frames)
+
+    def retrieve(self):
+        return True, self.frames[self.index]
+
+
+def test_variable_rate_clip_is_sampled_by_timestamp():
+    rng = np.random.default_rng(1)
+    times_ms = np.cumsum(rng.uniform(20, 60, 200)) - 20  # ~40 ms apart, jittered
+    frames = [np.full((72, 128, 3), i % 256, np.uint8) for i in range(len(times_ms))]  # always changing
+    stats = {}
+    times = [t for t, _ in app.sample_clip_frames(_VariableRateCapture(frames, times_ms), stats)]
+
+    assert stats["fps"] is None
+    assert times == sorted(times) and times[-1] > 6.0
+    gaps = np.diff(times)
+    assert gaps.min() >= 1 / app.CLIP_SAMPLE_FPS - 0.002
+    assert gaps.max() < 1.0
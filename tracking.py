@@ -0,0 +1,159 @@
+"""Per-session object tracking so detectors can re-check small regions, not whole frames.
+
+After a full-frame pass, the boxes a detector saw are kept with a small grey template
+each. On the next frames of the same session each box is followed by template
+matching inside a search window on a downscaled grey copy (a few milliseconds), and
+the detector is re-run only on enlarged crops around the followed boxes. A full-frame
+pass happens again every ``REFRESH_EVERY`` frames, whenever a class the caller still
+looks for has no track, or when the frame size changes, so objects entering elsewhere
+are still picked up.
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+
+import cv2
+import numpy as np
+
+
+Box = Tuple[float, float, float, float]  # x1, y1, x2, y2 in full-frame pixels
+
+# Template matching runs on a copy whose longer side is this
+TRACK_SIDE = 320
+# Full-frame pass at least every this many frames
+REFRESH_EVERY = 5
+# Search window / crop: the box grown by this fraction of its size on every side
+SEARCH_PAD = 0.5
+ROI_PAD = 0.5
+ROI_MIN_SIDE = 128
+# Normalized cross-correlation below this means the object was lost
+MATCH_THRESHOLD = 0.5
+# Drop a track not re-confirmed by the detector on this many crop passes in a row
+MAX_MISSES = 2
+MAX_TRACKS = 8
+
+
+@dataclass
+class Track:
+    name: str
+    box: Box
+    template: np.ndarray
+    misses: int = 0
+
+
+def _grow(box: Box, pad: float, min_side: float, width: int, height: int) -> Tuple[int, int, int, int]:
+    """``box`` enlarged by ``pad`` of its size per side (and to ``min_side``), clipped."""
+    x1, y1, x2, y2 = box
+    cx, cy = (x1 + x2) / 2, (y1 + y2) / 2
+    half_w = max((x2 - x1) * (0.5 + pad), min_side / 2)
+    half_h = max((y2 - y1) * (0.5 + pad), min_side / 2)
+    return (max(0, int(cx - half_w)), max(0, int(cy - half_h)),
+            min(width, int(np.ceil(cx + half_w))), min(height, int(np.ceil(cy + half_h))))
+
+
+class ROITracker:
+    """Tracks for one detector in one session."""
+
+    def __init__(self) -> None:
+        self.tracks: List[Track] = []
+        self.frames_since_refresh = 0
+        self._shape: Optional[Tuple[int, ...]] = None
+        self._scale = 1.0
+
+    def needs_refresh(self, frame: np.ndarray, names: Set[str]) -> bool:
+        """Whether the next pass must be full-frame (every class in ``names`` needs a track)."""
+        return (
+            not self.tracks or self.frames_since_refresh >= REFRESH_EVERY or frame.shape != self._shape
+            or not names <= {t.name for t in self.tracks}
+        )
+
+    def _thumb(self, frame: np.ndarray) -> np.ndarray:
+        h, w = frame.shape[:2]
+        self._scale = min(1.0, TRACK_SIDE / max(h, w))
+        grey = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self._scale < 1.0:
+            grey = cv2.resize(grey, (round(w * self._scale), round(h * self._scale)), interpolation=cv2.INTER_AREA)
+        return grey
+
+    def _template(self, thumb: np.ndarray, box: Box) -> Optional[np.ndarray]:
+        x1, y1, x2, y2 = (int(round(v * self._scale)) for v in box)
+        x1, y1 = max(0, x1), max(0, y1)
+        patch = thumb[y1:y2, x1:x2]
+        return patch.copy() if min(patch.shape[:2]) >= 8 else None
+
+    def reset(self, frame: np.ndarray, boxes: Iterable[Tuple[str, Box]]) -> None:
+        """Start over from a full-frame pass: track every box the detector saw."""
+        thumb = self._thumb(frame)
+        self.tracks = []
+        for name, box in boxes:
+            template = self._template(thumb, box)
+            if template is not None:
+                self.tracks.append(Track(name, box, template))
+        self.tracks = self.tracks[:MAX_TRACKS]
+        self.frames_since_refresh = 0
+        self._shape = frame.shape
+
+    def follow(self, frame: np.ndarray, names: Set[str]) -> None:
+        """Move each track (of a class still in ``names``) to its best match in this frame."""
+        thumb = self._thumb(frame)
+        th, tw = thumb.shape[:2]
+        kept: List[Track] = []
+        for track in self.tracks:
+            if track.name not in names:
+                continue
+            x1, y1, x2, y2 = _grow(tuple(v * self._scale for v in track.box), SEARCH_PAD, 0, tw, th)
+            window = thumb[y1:y2, x1:x2]
+            t_h, t_w = track.template.shape[:2]
+            if window.shape[0] < t_h or window.shape[1] < t_w:
+                continue
+            _, score, _, (mx, my) = cv2.minMaxLoc(cv2.matchTemplate(window, track.template, cv2.TM_CCOEFF_NORMED))
+            if score < MATCH_THRESHOLD:
+                continue
+            nx, ny = (x1 + mx) / self._scale, (y1 + my) / self._scale
+            bw, bh = track.box[2] - track.box[0], track.box[3] - track.box[1]
+            track.box = (nx, ny, nx + bw, ny + bh)
+            kept.append(track)
+        self.tracks = kept
+        self.frames_since_refresh += 1
+
+    def rois(self) -> List[Tuple[int, int, int, int]]:
+        """Crop rectangles (x1, y1, x2, y2) around the current tracks."""
+        h, w = self._shape[:2]
+        return [_grow(t.box, ROI_PAD, ROI_MIN_SIDE, w, h) for t in self.tracks]
+
+    def confirm(self, frame: np.ndarray, boxes: Sequence[Tuple[str, Box]],
+                rejected: Sequence[Tuple[str, Box]] = ()) -> None:
+        """Fold in the boxes a crop pass found: refresh matched tracks, age the others.
+
+        Tracks overlapping a ``rejected`` box (one the caller ruled out) are dropped.
+        """
+        thumb = self._thumb(frame)
+        unmatched = list(boxes)
+        kept: List[Track] = []
+        for track in self.tracks:
+            if any(name == track.name and _iou(box, track.box) > 0.1 for name, box in rejected):
+                continue
+            best = max(
+                (b for b in unmatched if b[0] == track.name),
+                key=lambda b: _iou(b[1], track.box), default=None,
+            )
+            if best is not None and _iou(best[1], track.box) > 0.1:
+                unmatched.remove(best)
+                template = self._template(thumb, best[1])
+                track.box, track.misses = best[1], 0
+                if template is not None:
+                    track.template = template
+            else:
+                track.misses += 1
+            if track.misses < MAX_MISSES:
+                kept.append(track)
+        self.tracks = kept
+
+
+def _iou(a: Box, b: Box) -> float:
+    ix = max(0.0, min(a[2], b[2]) - max(a[0], b[0]))
+    iy = max(0.0, min(a[3], b[3]) - max(a[1], b[1]))
+    inter = ix * iy
+    union = (a[2] - a[0]) * (a[3] - a[1]) + (b[2] - b[0]) * (b[3] - b[1]) - inter
+    return inter / union if union > 0 else 0.0